@@ -1,16 +1,39 @@
 import numpy as np
 import logging
+import time
 import matplotlib.pyplot as plt
-from phased_array import initialize_simulation_grid, compute_wave_pattern, compute_beam_profile, \
-    compute_receiver_pattern, current_speed
+from matplotlib.colors import Normalize
+from phased_array import compute_beam_profile, compute_beam_map, compute_wave_pattern, \
+    compute_receiver_pattern, DEFAULT_TILE_BUDGET, stride_grid, compute_preview_stride, SimulationContext
+from phasor_cache import PhasorCache, compute_wave_pattern_cached
+from grid_cache import GridCache
+from grid_planner import DEFAULT_MEMORY_BUDGET
+from result_cache import ResultCache, result_key
+from hybrid_map import compute_wave_pattern_hybrid, HYBRID_MIN_ELEMENTS, HYBRID_TARGET_ERROR
+from parallel_map import compute_wave_pattern_parallel
+from viewport import ViewportTiles
+from beam_metrics import beam_metrics
+from wave_animation import compute_transmitter_field, compute_hybrid_transmitter_field, compute_receiver_field, \
+    animation_frames, export_frames, DEFAULT_FRAME_BUDGET
+from perf_stats import recorder
 from mainStyle import darkColor, greenColor, purpleColor,redColor,blueGreenColor
 
+PREVIEW_TARGET_LATENCY = 0.030  # Seconds per coarse preview frame while a slider is dragged
+INITIAL_SECONDS_PER_POINT = 2e-8  # Field cost per (pixel × emitter) until the first measurement
+
 logging.basicConfig(
     filename="Logging.log",
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+def map_engine(state):
+    # grid_planner.MAP_ENGINES entry compute_results runs for an emitter map of this state
+    if state['N'] > HYBRID_MIN_ELEMENTS:
+        return 'hybrid'
+    return 'tiled' if state['parallel_backend'] != 'serial' else 'phasor'
+
+
 class BeamForming:
     def __init__(self, fig, axs, initial_state):
         self.fig = fig
@@ -18,50 +41,182 @@ class BeamForming:
         if isinstance(axs, list) or isinstance(axs, np.ndarray):
             self.map_ax = axs[0]
             self.profile_ax = axs[1]
+            self.sweep_ax = axs[2] if len(axs) > 2 else None
         else:
             self.map_ax = axs
             self.profile_ax = axs
+            self.sweep_ax = None
 
         self.state = {
-            'mode': 'Emitter','N': 2,'f': 500,'distance': 0.1,'direction': 0, 'geometry': 'Linear', 'scenario': 'Default Mode','sizeX': 5,'sizeY': 10}
+            'mode': 'Emitter','N': 2,'f': 500,'distance': 0.1,'direction': 0, 'geometry': 'Linear', 'scenario': 'Default Mode','sizeX': 5,'sizeY': 10,
+            'max_points': 1000,
+            'tile_budget': DEFAULT_TILE_BUDGET, 'render_mode': 'image', 'context': SimulationContext(),
+            # Hybrid maps: the transition radius is the smallest whose error meets the target, unless given
+            'far_field_distance': None, 'hybrid_target_error': HYBRID_TARGET_ERROR, 'parallel_backend': 'serial',
+            # Grid planner limits; no latency target by default, previews keep dragging responsive instead
+            'memory_budget': DEFAULT_MEMORY_BUDGET, 'latency_target': None,
+            # While animating, full-resolution jobs also compute the complex field the frames are rotated from
+            'animate': False}
         
         self.state.update(initial_state)  
 
         logging.info(f"Initial state: {self.state}")
 
-        self.grid, self.wavelength = initialize_simulation_grid(
-            self.state['N'], self.state['f'], self.state['distance'],sizeX=self.state['sizeX'],sizeY=self.state['sizeY']
-        )
+        self.grid_cache = GridCache()
+        self.update_grid()
+        self.display_grid = self.grid
         self.colorbar = None
+        self.map_image = None
+        self.map_background = None
+        self.map_extent = None
+        self.viewport = None  # (x_range, y_range, width, height) of the zoomed window shown instead of the full map
+        self.viewport_tiles = ViewportTiles()
+        self.limits_listener = None
+        self.map_ax.figure.canvas.mpl_connect('draw_event', self.on_map_draw)
+        self.profile_line = None
+        self.profile_background = None
+        self.profile_ax.figure.canvas.mpl_connect('draw_event', self.on_profile_draw)
+        self.phasor_cache = PhasorCache()
+        self.result_cache = ResultCache()
+        self.animation_field = None
+        self.animation_frequency = None
+        self.animation_image = None
+        self.hud_text = None
+        self.seconds_per_point = INITIAL_SECONDS_PER_POINT
         self.update_wave_pattern()
 
+    def span_tags(self):
+        return {'grid': self.grid[0].shape, 'N': self.state['N'], 'mode': self.state['mode']}
+
     def update_wave_pattern(self):
-        if self.state['mode'] == 'Receiver':
-            self.state['f']  
-            self.wavelength = current_speed / self.state['f']
-            self.wave_pattern, self.positions = self.update_receiver_pattern()
-            print(self.state['f'])
+        self.render_results(self.compute_results(self.state, self.grid))
+
+    def compute_preview(self, target_latency=PREVIEW_TARGET_LATENCY):
+        # Coarse preview on a strided view of the grid, sized from the measured field throughput
+        emitters = 1 if self.state['mode'] == 'Receiver' else self.state['N']
+        stride = compute_preview_stride(self.grid, emitters, self.seconds_per_point, target_latency)
+        return self.compute_results(self.state, stride_grid(self.grid, stride), preview=True)
 
-            angles, beam_profile =compute_beam_profile(self.state['N'], self.state['f'], self.state['distance'] ,self.state['direction'], self.positions,geometry=self.state['geometry'], arc_radius=self.state.get('curvature', 1.0), mode=self.state['mode'])
+    def compute_results(self, state, grid, cancelled=None, preview=False):
+        # Pure computation for one state snapshot: safe to run off the GUI thread.
+        # cancelled() is polled between stages so a superseded job stops early and returns None.
+        cancelled = cancelled or (lambda: False)
+        tags = {'grid': grid[0].shape, 'N': state['N'], 'mode': state['mode'], 'preview': preview}
+        results = {'state': dict(state), 'grid': grid, 'preview': preview}
+        start = time.perf_counter()
+
+        # Previews are never cached: their strided grids are throwaway
+        key = None if preview else result_key(state, grid)
+        cached = None if key is None else self.result_cache.get(key)
+        if cached is not None:
+            results.update(cached)
         else:
-            self.wave_pattern, self.positions = compute_wave_pattern(
-                self.state['N'], self.state['f'], self.state['direction'], self.state['distance'],
-                self.grid, geometry=self.state['geometry'], arc_radius=self.state.get('curvature', 1.0)
-            )
-            print("trans wave")
+            if state['mode'] == 'Receiver':
+                with recorder.span('field', **tags):
+                    results['wave_pattern'], results['positions'] = self.update_receiver_pattern(state, grid)
+                if cancelled():
+                    return None
 
-            angles, beam_profile = compute_beam_profile(
-                self.state['N'], self.state['f'], self.state['distance'], self.state['direction'],self.positions,
-                geometry=self.state['geometry'], arc_radius=self.state.get('curvature', 1.0), mode=self.state['mode']
-            )
+                with recorder.span('beam_profile', **tags):
+                    results['angles'], results['beam_profile'] = compute_beam_profile(state['N'], state['f'], state['distance'] ,state['direction'], results['positions'],geometry=state['geometry'], arc_radius=state.get('curvature', 1.0), mode=state['mode'], context=state['context'])
+            else:
+                with recorder.span('field', **tags):
+                    engine = map_engine(state)
+                    if engine == 'hybrid':
+                        # Large arrays: exact sum inside the far-field distance, array-factor lookup beyond it.
+                        # Where the far field never reaches the grid the whole map is exact, on the selected pool.
+                        results['wave_pattern'], results['positions'], results['hybrid_report'] = \
+                            compute_wave_pattern_hybrid(
+                                state['N'], state['f'], state['direction'], state['distance'], grid,
+                                geometry=state['geometry'], arc_radius=state.get('curvature', 1.0),
+                                far_field_distance=state['far_field_distance'], tile_budget=state['tile_budget'],
+                                target_error=state['hybrid_target_error'],
+                                parallel_backend=state['parallel_backend'], context=state['context']
+                            )
+                    elif engine == 'tiled':
+                        # Row bands over a thread or process pool; small grids fall back to the serial path
+                        results['wave_pattern'], results['positions'] = compute_wave_pattern_parallel(
+                            state['N'], state['f'], state['direction'], state['distance'], grid,
+                            geometry=state['geometry'], arc_radius=state.get('curvature', 1.0),
+                            tile_budget=state['tile_budget'], precision=grid[0].dtype, backend=state['parallel_backend'],
+                            context=state['context']
+                        )
+                    else:
+                        results['wave_pattern'], results['positions'] = compute_wave_pattern_cached(
+                            self.phasor_cache, state['N'], state['f'], state['direction'], state['distance'],
+                            grid, geometry=state['geometry'], arc_radius=state.get('curvature', 1.0),
+                            tile_budget=state['tile_budget'], context=state['context']
+                        )
+                # Field cost used to size preview grids: jumps up at once, decays slowly after cheap (cached) runs
+                self.seconds_per_point = max((time.perf_counter() - start) / (grid[0].size * max(state['N'], 1)),
+                                             0.9 * self.seconds_per_point)
+                if cancelled():
+                    return None
+
+                with recorder.span('beam_profile', **tags):
+                    results['angles'], results['beam_profile'] = compute_beam_profile(
+                        state['N'], state['f'], state['distance'], state['direction'],results['positions'],
+                        geometry=state['geometry'], arc_radius=state.get('curvature', 1.0), mode=state['mode'],
+                        context=state['context']
+                    )
+                if cancelled():
+                    return None
+
+            if key is not None:
+                self.result_cache.put(key, results)
 
-        self.plot_simulation()
-        self.plot_beam_profile(angles, beam_profile)
+        results['beam_metrics'] = beam_metrics(results['angles'], results['beam_profile'])
+
+        if state['animate'] and not preview:
+            # Complex field from the engine that drew the map, so the GUI thread only rotates its phase per frame
+            with recorder.span('animation_field', **tags):
+                results['animation_field'] = self.compute_animation_field(state, grid)
+            if cancelled():
+                return None
+
+        if state['mode'] != 'Receiver' and self.sweep_ax is not None and not preview:
+            # Every steering angle at the current frequency in one batched evaluation
+            with recorder.span('steering_map', **tags):
+                steering_angles = np.arange(-90, 91, 1)
+                angles, beam_map = compute_beam_map(
+                    state['N'], state['f'], state['distance'], steering_angles,
+                    geometry=state['geometry'], arc_radius=state.get('curvature', 1.0),
+                    context=state['context']
+                )
+                results['steering_map'] = (steering_angles, angles, beam_map[0])
+
+        # Results are handed to the GUI by reference, freeze them so neither side can mutate shared data
+        for value in results.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        return results
+
+    def render_results(self, results):
+        # Previews are drawn on their coarse grid, self.grid stays the full-resolution one
+        self.display_grid = results['grid']
+        self.wave_pattern, self.positions = results['wave_pattern'], results['positions']
+        if results['state']['mode'] == 'Receiver':
+            self.wavelength = results['state']['context'].wavelength(results['state']['f'])
+
+        tags = self.span_tags()
+        with recorder.span('plot.map', **tags):
+            self.plot_simulation()
+        with recorder.span('plot.beam_profile', **tags):
+            self.plot_beam_profile(results['angles'], results['beam_profile'], results['beam_metrics'])
+        if results['preview']:
+            # Previews leave the steering map and animation alone until the full-resolution refinement lands
+            return
+        with recorder.span('plot.steering_map', **tags):
+            self.plot_steering_map(results.get('steering_map'), results['state']['direction'])
+        if 'animation_field' in results:
+            self.start_animation(results)
         logging.info("Wave pattern updated")
 
-    def update_receiver_pattern(self):
-        receiver_count = self.state.get('receiver_count', 1)
-        receiver_spacing = self.state.get('receiver_spacing', 0.5)
+    def update_receiver_pattern(self, state=None, grid=None):
+        state = self.state if state is None else state
+        grid = self.grid if grid is None else grid
+        receiver_count = state.get('receiver_count', 1)
+        receiver_spacing = state.get('receiver_spacing', 0.5)
         receiver_positions = np.linspace(
         -receiver_spacing * (receiver_count - 1) / 2,
         receiver_spacing * (receiver_count - 1) / 2,
@@ -72,68 +227,195 @@ class BeamForming:
         )
 
         wave_pattern, _ = compute_receiver_pattern(
-            self.grid, receiver_positions, frequency=self.state['f'],steering_angle=self.state['direction']
+            grid, receiver_positions, frequency=state['f'],steering_angle=state['direction'],
+            context=state['context']
         )
         return wave_pattern, receiver_positions
 
 
     def plot_simulation(self):
+        if self.state['render_mode'] == 'contour':
+            self.plot_simulation_contour()
+        else:
+            self.plot_simulation_image()
+
+    def setup_map_axes(self):
+        # Static part of the map: redone only when the grid extent or the render mode changes
         self.map_ax.clear()
         self.map_ax.set_facecolor(darkColor)
         self.fig.patch.set_facecolor(darkColor)
-        self.map_ax.set_xticks(np.arange(np.min(self.grid[0]), np.max(self.grid[0]), 1))
-        self.map_ax.set_xlim(np.min(self.grid[0]), np.max(self.grid[0]))
-        self.map_ax.set_ylim(np.min(self.grid[1]), np.max(self.grid[1]))
-        self.color_map = plt.cm.get_cmap("viridis")
-
-        contour = self.map_ax.contourf(self.grid[0], self.grid[1], self.wave_pattern, levels=50, cmap='viridis', extend='both')
+        self.map_ax.set_xticks(np.arange(np.min(self.display_grid[0]), np.max(self.display_grid[0]), 1))
+        self.map_ax.set_xlim(np.min(self.display_grid[0]), np.max(self.display_grid[0]))
+        self.map_ax.set_ylim(np.min(self.display_grid[1]), np.max(self.display_grid[1]))
+        self.map_ax.set_xlabel("X Position (m)", color=greenColor)
+        self.map_ax.set_ylabel("Y Position (m)", color=greenColor)
+        self.map_ax.tick_params(axis='both', colors=greenColor)
+        self.map_background = None
+        self.connect_limits_listener()
 
-        if self.colorbar is None:       
-            self.colorbar = self.fig.colorbar(contour, ax=self.map_ax, orientation='vertical', pad=0.05)
+    def update_colorbar(self, mappable):
+        if self.colorbar is None:
+            self.colorbar = self.map_ax.figure.colorbar(mappable, ax=self.map_ax, orientation='vertical', pad=0.05)
             self.colorbar.set_label("Wave Intensity", color=greenColor)
             self.colorbar.ax.tick_params(colors=greenColor)
         else:
-            self.colorbar.update_normal(contour)
+            self.colorbar.update_normal(mappable)
+
+    def map_amplitude(self):
+        # Largest possible |Σ cos|: one per emitter, a single wave in receiver mode
+        return 1.0 if self.state['mode'] == 'Receiver' else float(max(len(self.positions), 1))
+
+    def set_map_norm(self, amplitude):
+        # Rescaling the shared norm moves the colorbar ticks without rebuilding the colorbar
+        if (self.map_norm.vmin, self.map_norm.vmax) != (-amplitude, amplitude):
+            self.map_norm.vmin, self.map_norm.vmax = -amplitude, amplitude
+            self.colorbar.update_normal(self.map_image)
+            self.map_background = None
+
+    def plot_simulation_image(self):
+        # Fast mode: one persistent image artist whose data is swapped in place, blitted by draw_map
+        extent = (float(np.min(self.display_grid[0])), float(np.max(self.display_grid[0])),
+                  float(np.min(self.display_grid[1])), float(np.max(self.display_grid[1])))
+        tags = self.span_tags()
+
+        if self.map_image is None or self.map_image.axes is None or self.map_extent != extent:
+            self.setup_map_axes()
+            self.map_norm = Normalize(-self.map_amplitude(), self.map_amplitude())
+            self.map_image = self.map_ax.imshow(self.wave_pattern, extent=extent, origin='lower', aspect='auto',
+                                                cmap='viridis', norm=self.map_norm, animated=True)
+            self.map_markers, = self.map_ax.plot([], [], 'o', color=redColor, markersize=10, animated=True)
+            self.map_extent = extent
+            with recorder.span('plot.colorbar', **tags):
+                self.update_colorbar(self.map_image)
+        else:
+            with recorder.span('plot.image', **tags):
+                self.map_image.set_data(self.wave_pattern)
+                self.map_image.set_extent(extent)
+            with recorder.span('plot.colorbar', **tags):
+                self.set_map_norm(self.map_amplitude())
+
+        self.map_markers.set_data(self.positions[:, 0], self.positions[:, 1])
+        self.viewport = None
+
+    def set_limits_listener(self, callback):
+        # callback(axes) on every zoom or pan of the map
+        self.limits_listener = callback
+        self.connect_limits_listener()
+
+    def connect_limits_listener(self):
+        # Axes.clear() drops the axes callbacks, so every setup_map_axes connects the listener again
+        if self.limits_listener is not None:
+            self.map_ax.callbacks.connect('xlim_changed', self.limits_listener)
+            self.map_ax.callbacks.connect('ylim_changed', self.limits_listener)
+
+    def zoomed_viewport(self):
+        # (x_range, y_range, width, height) of the visible window in canvas pixels, None while the full map is shown
+        if self.map_image is None or self.map_image.axes is None or self.map_extent is None:
+            return None
+        x_range, y_range = tuple(sorted(self.map_ax.get_xlim())), tuple(sorted(self.map_ax.get_ylim()))
+        if np.allclose(x_range + y_range, self.map_extent):
+            return None
+        return x_range, y_range, int(self.map_ax.bbox.width), int(self.map_ax.bbox.height)
+
+    def compute_viewport_field(self, state, grid):
+        # Map on one viewport tile: the engine map_engine picks for compute_results, on the same pool and kernel
+        # backend, without the per-grid phasor and result caches (a tile grid is seen once and then cached as a tile)
+        if state['mode'] == 'Receiver':
+            return self.update_receiver_pattern(state, grid)[0]
+        engine = map_engine(state)
+        if engine == 'hybrid':
+            return compute_wave_pattern_hybrid(
+                state['N'], state['f'], state['direction'], state['distance'], grid, geometry=state['geometry'],
+                arc_radius=state.get('curvature', 1.0), far_field_distance=state['far_field_distance'],
+                tile_budget=state['tile_budget'], target_error=state['hybrid_target_error'],
+                parallel_backend=state['parallel_backend'], context=state['context']
+            )[0]
+        if engine == 'tiled':
+            return compute_wave_pattern_parallel(
+                state['N'], state['f'], state['direction'], state['distance'], grid, geometry=state['geometry'],
+                arc_radius=state.get('curvature', 1.0), tile_budget=state['tile_budget'], precision=grid[0].dtype,
+                backend=state['parallel_backend'], context=state['context']
+            )[0]
+        # Serial: the tiled kernels of context.backend
+        return compute_wave_pattern(
+            state['N'], state['f'], state['direction'], state['distance'], grid, geometry=state['geometry'],
+            arc_radius=state.get('curvature', 1.0), tile_budget=state['tile_budget'], precision=grid[0].dtype,
+            context=state['context']
+        )[0]
+
+    def compute_viewport(self, state, viewport, cancelled=None):
+        # Visible window of a zoomed map at canvas resolution, from cached tiles; a job like compute_results
+        x_range, y_range, width, height = viewport
+        with recorder.span('viewport', N=state['N'], mode=state['mode'], pixels=width * height):
+            window = self.viewport_tiles.window(state, x_range, y_range, width, height, self.compute_viewport_field,
+                                                dtype=state['context'].dtypes()[0], cancelled=cancelled)
+        if window is None:
+            return None
+        grid, wave_pattern = window
+        wave_pattern.flags.writeable = False
+        return {'state': dict(state), 'grid': grid, 'wave_pattern': wave_pattern, 'viewport': viewport}
+
+    def render_viewport(self, results):
+        # Swap the zoomed window into the map image; the axes limits stay where the user put them
+        if self.map_image is None or self.map_image.axes is None:
+            return
+        X_grid, Y_grid = results['grid']
+        self.map_image.set_data(results['wave_pattern'])
+        self.map_image.set_extent((float(X_grid[0, 0]), float(X_grid[0, -1]), float(Y_grid[0, 0]), float(Y_grid[-1, 0])))
+        self.viewport = results['viewport']
+
+    def reset_viewport(self):
+        # Back to the full map after zooming out to the whole grid
+        if self.viewport is None or self.map_image is None or self.map_image.axes is None:
+            return
+        self.map_image.set_data(self.wave_pattern)
+        self.map_image.set_extent(self.map_extent)
+        self.viewport = None
+
+    def plot_simulation_contour(self):
+        # High-quality mode: the original 50-level filled contour, rebuilt on every update
+        self.setup_map_axes()
+        self.map_image = None
+        self.color_map = plt.get_cmap("viridis")
+
+        tags = self.span_tags()
+        with recorder.span('plot.contourf', **tags):
+            contour = self.map_ax.contourf(self.display_grid[0], self.display_grid[1], self.wave_pattern, levels=50, cmap='viridis', extend='both')
+
+        with recorder.span('plot.colorbar', **tags):
+            self.update_colorbar(contour)
 
         self.map_ax.plot(self.positions[:, 0], self.positions[:, 1], 'o', color=redColor, markersize=10)
-        self.map_ax.set_xlabel("X Position (m)", color=greenColor)
-        self.map_ax.set_ylabel("Y Position (m)", color=greenColor)
-        self.map_ax.tick_params(axis='both', colors=greenColor)
         plt.draw()
 
-    def plot_beam_profile(self, angles, beam_profile):
+    def on_map_draw(self, event):
+        # After a full draw: cache the static axes as the blit background, then paint the animated artists on top
+        if self.map_image is None or self.map_image.axes is None:
+            self.map_background = None
+            self.draw_hud()
+            return
+        self.map_background = event.canvas.copy_from_bbox(self.map_ax.bbox)
+        self.map_ax.draw_artist(self.map_image)
+        self.map_ax.draw_artist(self.map_markers)
+        self.draw_hud()
+
+    def draw_map(self):
+        canvas = self.map_ax.figure.canvas
+        if self.map_image is None or self.map_image.axes is None or self.map_background is None:
+            canvas.draw()
+            return
+        canvas.restore_region(self.map_background)
+        self.map_ax.draw_artist(self.map_image)
+        self.map_ax.draw_artist(self.map_markers)
+        self.draw_hud()
+        canvas.blit(self.map_ax.bbox)
+
+    def setup_profile_axes(self):
+        # Static part of the polar plot: styling, ticks and grid are built once, not on every update
         self.profile_ax.clear()
         self.profile_ax.set_facecolor(darkColor)
         self.fig.patch.set_facecolor(darkColor)
 
-        angles_rad = np.radians(angles)
-        self.profile_ax.plot(angles_rad, beam_profile, color=greenColor)
-
-        # Threshold for -3 dB (70.7% of max intensity)
-        threshold_dB = -3  # -3 dB relative to the peak
-        max_dB = np.max(beam_profile)
-        threshold = max_dB + threshold_dB  # Since dB is in log scale, add threshold
-
-        # Find the angles where the beam profile crosses the threshold
-        crossing_indices = np.where(beam_profile >= threshold)[0]
-        if crossing_indices.size > 0:
-            left_cross = angles_rad[crossing_indices[0]]
-            right_cross = angles_rad[crossing_indices[-1]]
-
-            # Plot lines at the -3 dB points
-            self.profile_ax.axvline(left_cross, color=greenColor, linestyle='--', label="-3 dB Left")
-            self.profile_ax.axvline(right_cross, color=greenColor, linestyle='--', label="-3 dB Right")
-
-            # Annotate the points
-            self.profile_ax.text(
-                left_cross, max_dB - 5, f"{np.degrees(left_cross):.1f}°",
-                color=greenColor, ha='center'
-            )
-            self.profile_ax.text(
-                right_cross, max_dB - 5, f"{np.degrees(right_cross):.1f}°",
-                color=greenColor, ha='center'
-            )
-
         # Set the angle limits from -90 to 90 degrees
         self.profile_ax.set_thetalim(-np.pi / 2, np.pi / 2)
         self.profile_ax.set_theta_zero_location("N")
@@ -144,9 +426,214 @@ class BeamForming:
 
         self.fig.subplots_adjust(left=0.12, right=0.79, top=1.0, bottom=0.04)
         self.profile_ax.set_aspect('auto')
+
+        # Persistent artists, moved on every update and blitted by draw_profile
+        self.profile_line, = self.profile_ax.plot([], [], color=greenColor, animated=True)
+        self.profile_markers = [
+            self.profile_ax.axvline(0, color=greenColor, linestyle='--', label=label, animated=True)
+            for label in ("-3 dB Left", "-3 dB Right")
+        ]
+        self.profile_labels = [self.profile_ax.text(0, 0, "", color=greenColor, ha='center', animated=True)
+                               for _ in self.profile_markers]
+        self.profile_rlim = None
+        self.profile_background = None
+
+    def profile_artists(self):
+        return [self.profile_line] + self.profile_markers + self.profile_labels
+
+    def plot_beam_profile(self, angles, beam_profile, metrics=None):
+        if self.profile_line is None or self.profile_line.axes is None:
+            self.setup_profile_axes()
+
+        angles_rad = np.radians(angles)
+        self.profile_line.set_data(angles_rad, beam_profile)
+
+        # Radial limits snap to 10 dB steps and the floor only moves when the profile leaves a 40 dB band,
+        # so they (and the cached background) rarely change while dragging
+        rlim = (10 * np.floor(np.min(beam_profile) / 10), max(10 * np.ceil(np.max(beam_profile) / 10), 0))
+        if self.profile_rlim is None or rlim[1] != self.profile_rlim[1] \
+                or not self.profile_rlim[0] <= rlim[0] <= self.profile_rlim[0] + 40:
+            self.profile_ax.set_ylim(*rlim)
+            self.profile_rlim = rlim
+            self.profile_background = None
+
+        # -3 dB (70.7% of max intensity) crossings of the main lobe, interpolated between samples
+        self.profile_metrics = beam_metrics(angles, beam_profile) if metrics is None else metrics
+        max_dB = float(self.profile_metrics['peak_db'])
+        crossings = np.radians([float(self.profile_metrics['left_3db']), float(self.profile_metrics['right_3db'])])
+
+        # Move the existing -3 dB lines and labels instead of creating new ones
+        for marker, label, cross in zip(self.profile_markers, self.profile_labels, crossings):
+            marker.set_xdata([cross, cross])
+            label.set_position((cross, max_dB - 5))
+            label.set_text(f"{np.degrees(cross):.1f}°")
+
+    def on_profile_draw(self, event):
+        # After a full draw: cache the polar grid as the blit background, then paint the moving artists on top
+        if self.profile_line is None or self.profile_line.axes is None:
+            self.profile_background = None
+            return
+        self.profile_background = event.canvas.copy_from_bbox(self.profile_ax.bbox)
+        for artist in self.profile_artists():
+            self.profile_ax.draw_artist(artist)
+
+    def draw_profile(self):
+        canvas = self.profile_ax.figure.canvas
+        if self.profile_line is None or self.profile_line.axes is None or self.profile_background is None:
+            canvas.draw()
+            return
+        canvas.restore_region(self.profile_background)
+        for artist in self.profile_artists():
+            self.profile_ax.draw_artist(artist)
+        canvas.blit(self.profile_ax.bbox)
+
+    def plot_steering_map(self, steering_map=None, direction=0):
+        if self.sweep_ax is None:
+            return
+
+        self.sweep_ax.clear()
+        self.sweep_ax.set_facecolor(darkColor)
+        self.sweep_ax.tick_params(axis='both', colors=greenColor)
+
+        if steering_map is None:
+            self.sweep_ax.text(0.5, 0.5, "Steering sweep is\navailable in Transmitter mode", color=greenColor,
+                               ha='center', va='center', transform=self.sweep_ax.transAxes)
+            plt.draw()
+            return
+
+        steering_angles, angles, beam_map = steering_map
+        self.sweep_ax.imshow(beam_map, extent=[angles[0], angles[-1], steering_angles[0], steering_angles[-1]],
+                             origin='lower', aspect='auto', cmap='viridis', vmin=-40, vmax=0)
+        self.sweep_ax.axhline(direction, color=redColor, linestyle='--')
+        self.sweep_ax.set_xlabel("Observation Angle (°)", color=greenColor)
+        self.sweep_ax.set_ylabel("Steering Angle (°)", color=greenColor)
         plt.draw()
 
-    def update_state(self, **kwargs):
+    def compute_animation_field(self, state, grid):
+        # Complex field F with Re(F·e^{-iωt}) = map at time t, from the engine compute_results draws the map with
+        if state['mode'] == 'Receiver':
+            return compute_receiver_field(grid, state['f'], context=state['context'])
+        engine = map_engine(state)
+        if engine == 'hybrid':
+            field, _ = compute_hybrid_transmitter_field(
+                state['N'], state['f'], state['direction'], state['distance'], grid, geometry=state['geometry'],
+                arc_radius=state.get('curvature', 1.0), far_field_distance=state['far_field_distance'],
+                tile_budget=state['tile_budget'], target_error=state['hybrid_target_error'], context=state['context']
+            )
+            return field
+        # The phasor engine shares its cached per-emitter phasors, the parallel one accumulates tile by tile
+        field, _ = compute_transmitter_field(
+            self.phasor_cache if engine == 'phasor' else None, state['N'], state['f'], state['direction'],
+            state['distance'], grid, geometry=state['geometry'], arc_radius=state.get('curvature', 1.0),
+            tile_budget=state['tile_budget'], context=state['context']
+        )
+        return field
+
+    def start_animation(self, results, n_frames=DEFAULT_FRAME_BUDGET):
+        # Frames from the complex field compute_results returned with the map, each one is Re(F·e^{-iωt})
+        self.stop_animation()
+        self.animation_field = results['animation_field']
+        self.animation_frequency = results['state']['f']
+        self.animation_n_frames = n_frames
+        self.animation_frames = animation_frames(self.animation_field, self.animation_frequency, n_frames)
+
+        amplitude = np.max(np.abs(self.animation_field))
+        if self.map_image is not None and self.map_image.axes is not None:
+            # Fast rendering mode: frames go straight into the persistent map image
+            self.animation_image = self.map_image
+            self.set_map_norm(amplitude)
+        else:
+            X_grid, Y_grid = results['grid']
+            self.animation_image = self.map_ax.imshow(
+                np.zeros(self.animation_field.shape), extent=[np.min(X_grid), np.max(X_grid),
+                                                              np.min(Y_grid), np.max(Y_grid)],
+                origin='lower', aspect='auto', cmap='viridis', vmin=-amplitude, vmax=amplitude, zorder=1
+            )
+        logging.info(f"Animation started with {n_frames} frames")
+
+    def stop_animation(self):
+        if self.animation_image is not None and self.animation_image is self.map_image:
+            self.map_image.set_data(self.wave_pattern)
+            self.set_map_norm(self.map_amplitude())
+        elif self.animation_image is not None and self.animation_image.axes is not None:
+            self.animation_image.remove()
+        self.animation_image = None
+        self.animation_field = None
+
+    def next_animation_frame(self):
+        if self.animation_image is None:
+            return
+        frame = next(self.animation_frames, None)
+        if frame is None:
+            # Frame budget spent: the cycle covers a whole period, so start over seamlessly
+            self.animation_frames = animation_frames(self.animation_field, self.animation_frequency,
+                                                     self.animation_n_frames)
+            frame = next(self.animation_frames)
+        self.animation_image.set_data(frame)
+
+    def export_animation(self, path, n_frames=DEFAULT_FRAME_BUDGET):
+        # The running animation's field, else one computed for the current state (a blocking, user-started export)
+        if self.animation_field is not None:
+            field, frequency = self.animation_field, self.animation_frequency
+        else:
+            field, frequency = self.compute_animation_field(self.state, self.grid), self.state['f']
+        return export_frames(animation_frames(field, frequency, n_frames), path, n_frames, field.shape)
+
+    def set_hud_visible(self, visible):
+        # Per-stage p50/p95 overlay in the top-left corner of the map. An animated figure text: clearing the map
+        # axes keeps it, and placed in axes coordinates it lies inside the region draw_map blits.
+        if visible and self.hud_text is None:
+            self.hud_text = self.map_ax.figure.text(0.01, 0.99, "", transform=self.map_ax.transAxes, color=greenColor,
+                                                    family='monospace', fontsize=7, va='top', ha='left', zorder=10,
+                                                    bbox=dict(facecolor=darkColor, alpha=0.7, edgecolor='none'),
+                                                    animated=True)
+            self.update_hud()
+        elif not visible and self.hud_text is not None:
+            self.hud_text.remove()
+            self.hud_text = None
+
+    def update_hud(self):
+        if self.hud_text is not None:
+            self.hud_text.set_text("\n".join(recorder.hud_lines()))
+
+    def draw_hud(self):
+        if self.hud_text is not None:
+            self.map_ax.figure.draw_artist(self.hud_text)
+
+    def set_precision(self, precision):
+        # float32 halves the grid, the per-emitter phasors and the map buffers; each precision has its own cached grid
+        self.set_context(precision=precision)
+        self.update_grid()
+        self.display_grid = self.grid
+        self.phasor_cache.fields.clear()  # Phasors of the other precision would only crowd out the new ones
+        logging.info(f"Simulation precision set to {precision}")
+
+    def update_grid(self):
+        # Grid for the current medium, frequency band and extent; switching back to a scenario or band reuses it.
+        # The grid planner keeps the map within the memory budget and latency target by coarsening dx.
+        try:
+            self.grid, self.wavelength = self.grid_cache.get(
+                self.state['f'], sizeX=self.state['sizeX'], sizeY=self.state['sizeY'],
+                max_points=self.state['max_points'], geometry=self.state['geometry'], context=self.state['context'],
+                N=self.state['N'], mode=self.state['mode'], memory_budget=self.state['memory_budget'],
+                latency_target=self.state['latency_target'], tile_budget=self.state['tile_budget'],
+                engine=map_engine(self.state), parallel_backend=self.state['parallel_backend']
+            )
+        except ValueError:
+            if getattr(self, 'grid', None) is None:
+                raise
+            logging.warning("Grid refused by the memory budget, keeping the previous grid")
+        return self.grid
+
+    def set_context(self, **changes):
+        # The context is immutable: every change makes a new one, jobs already submitted keep the old one
+        self.set_state(context=self.state['context'].replace(**changes))
+
+    def set_state(self, **kwargs):
         self.state.update(kwargs)
-        print(f"Updated State: {self.state}")
+        logging.debug(f"Updated State: {self.state}")
+
+    def update_state(self, **kwargs):
+        self.set_state(**kwargs)
+        self.update_grid()  # Frequency, extent, medium or element count may call for another grid, as in update_plot
         self.update_wave_pattern()
@@ -0,0 +1,76 @@
+import numpy as np
+
+# Beam-profile metrics for a batch of profiles at once: profiles (..., A) in dB over shared angles (A,) in degrees,
+# as compute_beam_profile and compute_beam_map return them. Every metric is an array over the batch dimensions.
+
+BEAMWIDTH_THRESHOLD_DB = -3.0  # Half-power level relative to the peak
+NULL_DEPTH_DB = -20.0  # A local minimum at least this far below the peak counts as a null
+
+
+def interpolate_crossing(angles, profiles, rows, lower, threshold):
+    # Angle where the profile crosses threshold between samples lower and lower + 1, linear in dB
+    below, above = profiles[rows, lower], profiles[rows, lower + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(above != below, (threshold - below) / (above - below), 0.0)
+    return angles[lower] + np.clip(fraction, 0, 1) * (angles[lower + 1] - angles[lower])
+
+
+def beam_metrics(angles, profiles, threshold_db=BEAMWIDTH_THRESHOLD_DB, null_depth_db=NULL_DEPTH_DB):
+    # Main-lobe direction, interpolated -3 dB beamwidth, peak sidelobe level, nulls and a directivity estimate.
+    # The main lobe is the region between the first nulls (local minima) on either side of the peak, so grating
+    # lobes count as sidelobes instead of widening the beam. Crossings outside the scanned range clip to its edges.
+    angles = np.asarray(angles, dtype=np.float64)
+    profiles = np.asarray(profiles, dtype=np.float64)
+    batch_shape = profiles.shape[:-1]
+    profiles = profiles.reshape(-1, len(angles))
+    count, samples = profiles.shape
+    rows = np.arange(count)
+    index = np.arange(samples)
+
+    # Main lobe direction: arg max, refined by a parabola through the peak and its neighbours
+    peak = np.argmax(profiles, axis=1)
+    peak_db = profiles[rows, peak]
+    inner = np.clip(peak, 1, samples - 2)
+    left_db, centre_db, right_db = profiles[rows, inner - 1], profiles[rows, inner], profiles[rows, inner + 1]
+    curvature = left_db - 2 * centre_db + right_db
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = np.where((curvature < 0) & (inner == peak), 0.5 * (left_db - right_db) / curvature, 0.0)
+    step = (angles[inner + 1] - angles[inner - 1]) / 2
+    main_lobe_angle = angles[peak] + np.clip(offset, -0.5, 0.5) * step
+
+    # Nulls: local minima deep enough below the peak; the first ones around the peak bound the main lobe
+    minima = np.zeros_like(profiles, dtype=bool)
+    minima[:, 1:-1] = (profiles[:, 1:-1] < profiles[:, :-2]) & (profiles[:, 1:-1] <= profiles[:, 2:])
+    null_mask = minima & (profiles <= peak_db[:, None] + null_depth_db)
+    left_null = np.max(np.where(minima & (index < peak[:, None]), index, 0), axis=1)
+    right_null = np.min(np.where(minima & (index > peak[:, None]), index, samples - 1), axis=1)
+
+    # -3 dB crossings: last sample below the threshold on each side of the peak, interpolated to the crossing
+    threshold = peak_db + threshold_db
+    below = profiles < threshold[:, None]
+    left_below = np.max(np.where(below & (index < peak[:, None]), index, -1), axis=1)
+    right_below = np.min(np.where(below & (index > peak[:, None]), index, samples), axis=1)
+    left_3db = np.where(left_below >= 0,
+                        interpolate_crossing(angles, profiles, rows, np.maximum(left_below, 0), threshold), angles[0])
+    right_3db = np.where(right_below < samples,
+                         interpolate_crossing(angles, profiles, rows, np.clip(right_below - 1, 0, samples - 2),
+                                              threshold), angles[-1])
+
+    # Peak sidelobe level: the highest sample outside the main lobe, relative to the peak
+    outside = (index < left_null[:, None]) | (index > right_null[:, None])
+    sidelobe_db = np.max(np.where(outside, profiles, -np.inf), axis=1)
+    peak_sidelobe_db = np.where(np.isfinite(sidelobe_db), sidelobe_db - peak_db, np.nan)
+
+    # Directivity over the scanned sector: peak power over the mean power, D = Δθ·Umax / ∫U dθ
+    power = 10 ** ((profiles - peak_db[:, None]) / 10)
+    radians = np.radians(angles)
+    mean_power = np.sum((power[:, 1:] + power[:, :-1]) / 2 * np.diff(radians), axis=1) / (radians[-1] - radians[0])
+    directivity_db = -10 * np.log10(mean_power)
+
+    metrics = {
+        'main_lobe_angle': main_lobe_angle, 'peak_db': peak_db,
+        'beamwidth_3db': right_3db - left_3db, 'left_3db': left_3db, 'right_3db': right_3db,
+        'first_null_left': angles[left_null], 'first_null_right': angles[right_null],
+        'peak_sidelobe_db': peak_sidelobe_db, 'directivity_db': directivity_db, 'null_mask': null_mask
+    }
+    return {name: value.reshape(batch_shape + value.shape[1:]) for name, value in metrics.items()}
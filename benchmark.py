@@ -0,0 +1,200 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from field_kernels import KERNEL_BACKENDS, REFERENCE_BACKEND
+from parallel_map import compute_wave_pattern_parallel
+from phased_array import initialize_simulation_grid, compute_wave_pattern, compute_receiver_pattern, \
+    compute_beam_profile, compute_beam_profile_fft
+
+# Benchmarks for the phased_array kernels and the matplotlib render path.
+#   python benchmark.py run --out benchmarks/baseline.json
+#   python benchmark.py compare benchmarks/baseline.json benchmarks/current.json --threshold 0.2
+
+GRID_POINTS = (250, 500, 1000)  # max_points passed to initialize_simulation_grid
+ELEMENTS = (4, 16, 64)
+FREQUENCIES = (500, 2000)
+QUICK_GRID_POINTS = (250,)
+QUICK_ELEMENTS = (4, 16)
+QUICK_FREQUENCIES = (500,)
+SIZE_X = 5
+SIZE_Y = 7
+DISTANCE = 0.1
+STEERING_ANGLE = 30
+PARALLEL_CASES = ("threads", "processes")  # Row-band backends timed on the largest grid
+FINE_NUM_ANGLES = 65536  # Angular resolution of the sidelobe/null analysis cases
+
+
+def time_call(function, repeat):
+    # One warm-up call, then the wall time of each repeat
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def kernel_cases(grid_points, elements, frequencies):
+    for max_points, N, frequency in itertools.product(grid_points, elements, frequencies):
+        params = {'max_points': max_points, 'N': N, 'f': frequency}
+        grid_args = (N, frequency, DISTANCE)
+        grid_kwargs = {'sizeX': SIZE_X, 'sizeY': SIZE_Y, 'max_points': max_points}
+        grid, _ = initialize_simulation_grid(*grid_args, **grid_kwargs)
+        params['grid_shape'] = list(grid[0].shape)
+        receivers = np.column_stack((np.linspace(-0.035 * (N - 1), 0.035 * (N - 1), N), np.zeros(N)))
+
+        yield "initialize_simulation_grid", params, lambda: initialize_simulation_grid(*grid_args, **grid_kwargs)
+        for geometry in ("Linear", "Curved"):
+            yield f"compute_wave_pattern[{geometry}]", params, \
+                lambda geometry=geometry, grid=grid: compute_wave_pattern(N, frequency, STEERING_ANGLE, DISTANCE, grid,
+                                                                          geometry=geometry)
+        for backend in sorted(set(KERNEL_BACKENDS) - {REFERENCE_BACKEND}):
+            yield f"compute_wave_pattern[Linear,{backend}]", params, \
+                lambda backend=backend, grid=grid: compute_wave_pattern(N, frequency, STEERING_ANGLE, DISTANCE, grid,
+                                                                        backend=backend)
+        yield "compute_receiver_pattern", params, lambda grid=grid: compute_receiver_pattern(grid, receivers, frequency)
+        if max_points == grid_points[-1]:
+            for backend in PARALLEL_CASES:
+                yield f"compute_wave_pattern_parallel[{backend}]", params, \
+                    lambda backend=backend, grid=grid: compute_wave_pattern_parallel(N, frequency, STEERING_ANGLE,
+                                                                                     DISTANCE, grid, backend=backend)
+
+        if max_points == grid_points[0]:
+            # Beam profiles do not depend on the grid, time them once per (N, f)
+            profile_params = {'N': N, 'f': frequency}
+            for geometry in ("Linear", "Curved"):
+                yield f"compute_beam_profile[Emitter,{geometry}]", profile_params, \
+                    lambda geometry=geometry: compute_beam_profile(N, frequency, DISTANCE, STEERING_ANGLE, None,
+                                                                   geometry=geometry)
+            yield "compute_beam_profile[Receiver]", profile_params, \
+                lambda: compute_beam_profile(N, frequency, DISTANCE, STEERING_ANGLE, receivers, mode="Receiver")
+            yield "compute_beam_profile_fft[fine]", profile_params, \
+                lambda: compute_beam_profile_fft(N, frequency, DISTANCE, STEERING_ANGLE, num_angles=FINE_NUM_ANGLES,
+                                                 window='hann')
+
+
+def render_cases(grid_points, elements):
+    # The render path on an offscreen Agg canvas, including the canvas draw that the GUI triggers
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from BeamFormingSystem import BeamForming
+
+    for max_points, N in itertools.product(grid_points, elements):
+        map_figure = plt.figure(figsize=(7, 4))
+        profile_figure = plt.figure(figsize=(7, 4))
+        profile_figure.add_subplot(111, polar=True)
+        controller = BeamForming(profile_figure, [map_figure.gca(), profile_figure.gca()],
+                                 {'N': N, 'f': FREQUENCIES[0], 'direction': STEERING_ANGLE, 'distance': DISTANCE})
+        controller.grid, controller.wavelength = initialize_simulation_grid(
+            N, FREQUENCIES[0], DISTANCE, sizeX=SIZE_X, sizeY=SIZE_Y, max_points=max_points)
+        controller.update_wave_pattern()
+        angles, beam_profile = compute_beam_profile(N, FREQUENCIES[0], DISTANCE, STEERING_ANGLE, None)
+        params = {'max_points': max_points, 'N': N, 'grid_shape': list(controller.grid[0].shape)}
+
+        def plot_simulation(controller=controller, figure=map_figure):
+            controller.plot_simulation()
+            figure.canvas.draw()
+
+        def plot_beam_profile(controller=controller, figure=profile_figure):
+            controller.plot_beam_profile(angles, beam_profile)
+            figure.canvas.draw()
+
+        yield "BeamForming.plot_simulation", params, plot_simulation
+        yield "BeamForming.plot_beam_profile", params, plot_beam_profile
+        plt.close(map_figure)
+        plt.close(profile_figure)
+
+
+def case_key(name, params):
+    return name + "(" + ",".join(f"{key}={value}" for key, value in sorted(params.items())
+                                 if key != 'grid_shape') + ")"
+
+
+def run_benchmarks(out_path, repeat=5, quick=False, render=True):
+    grid_points = QUICK_GRID_POINTS if quick else GRID_POINTS
+    elements = QUICK_ELEMENTS if quick else ELEMENTS
+    frequencies = QUICK_FREQUENCIES if quick else FREQUENCIES
+
+    cases = kernel_cases(grid_points, elements, frequencies)
+    if render:
+        cases = itertools.chain(cases, render_cases(grid_points, elements))
+
+    results = {}
+    for name, params, function in cases:
+        timings = time_call(function, repeat)
+        key = case_key(name, params)
+        results[key] = {'name': name, 'params': dict(params), 'median_s': float(np.median(timings)),
+                        'min_s': float(np.min(timings)), 'repeat': repeat}
+        print(f"{key:<90} {results[key]['median_s'] * 1e3:10.3f} ms")
+
+    report = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'platform': platform.platform(), 'cpu_count': os.cpu_count()},
+        'results': results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w") as file:
+        json.dump(report, file, indent=2)
+    logging.info(f"Benchmark results written to {out_path}")
+    return report
+
+
+def compare_benchmarks(baseline_path, current_path, threshold=0.2):
+    # Flags cases whose median time grew by more than threshold (0.2 = 20 %) over the baseline
+    with open(baseline_path) as file:
+        baseline = json.load(file)['results']
+    with open(current_path) as file:
+        current = json.load(file)['results']
+
+    regressions = []
+    for key in sorted(set(baseline) & set(current)):
+        ratio = current[key]['median_s'] / baseline[key]['median_s']
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{key:<90} {baseline[key]['median_s'] * 1e3:10.3f} ms -> "
+              f"{current[key]['median_s'] * 1e3:10.3f} ms  x{ratio:5.2f} {flag}")
+        if flag:
+            regressions.append(key)
+
+    for key in sorted(set(baseline) ^ set(current)):
+        print(f"{key:<90} only in {'baseline' if key in baseline else 'current'}")
+
+    print(f"{len(regressions)} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Beam-forming kernel and render benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark suite and write a JSON baseline")
+    run.add_argument("--out", default="benchmarks/baseline.json")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--quick", action="store_true", help="Smallest grid and element counts only")
+    run.add_argument("--no-render", action="store_true", help="Skip the matplotlib render benchmarks")
+
+    compare = commands.add_parser("compare", help="Compare two result files and flag regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown, 0.2 = 20 %%")
+
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run_benchmarks(args.out, repeat=args.repeat, quick=args.quick, render=not args.no_render)
+        return 0
+    return 1 if compare_benchmarks(args.baseline, args.current, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def nbytes_of(value):
+    # Total size of the numpy arrays held by a cache entry (tuples/lists/dicts are walked)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(nbytes_of(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes_of(item) for item in value)
+    return 0
+
+
+class BoundedLRU:
+    def __init__(self, max_bytes, name="cache"):
+        self.max_bytes = int(max_bytes)
+        self.name = name
+        self.entries = OrderedDict()  # key -> (value, nbytes), oldest first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()  # The GUI thread and the simulation worker share caches
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fits(self, nbytes):
+        return nbytes <= self.max_bytes
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = nbytes_of(value)
+        if not self.fits(nbytes):
+            logging.debug(f"{self.name}: entry of {nbytes} bytes exceeds cap of {self.max_bytes} bytes, not cached")
+            return False
+
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+            # Evict least recently used entries until we are back under the cap
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries), 'bytes': self.current_bytes, 'max_bytes': self.max_bytes,
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions
+        }
@@ -0,0 +1,141 @@
+import logging
+
+import numpy as np
+
+from field_kernels import resolve_precision, DEFAULT_TILE_BUDGET
+
+DEFAULT_NUM_ANGLES = 500  # Observation angles in a beam profile
+ELEMENT_BLOCK = 256  # Elements per steering-matrix block
+STEERING_TEMPORARIES = 2  # Scratch (points, elements) arrays alive per block: distances and phasors
+
+
+class ElementArray:
+    # General array description: element positions (N, 2) in metres and complex weights (N,) or (N, S).
+    # A weight column is one excitation (amplitude and phase per element); S columns are evaluated together.
+    def __init__(self, positions, weights=None, precision=None):
+        self.real_dtype, self.complex_dtype = resolve_precision(precision)
+        positions = np.asarray(positions, dtype=self.real_dtype)
+        if positions.ndim != 2 or positions.shape[1] != 2:
+            logging.error(f"Invalid element positions with shape {positions.shape}, expected (N, 2)")
+            raise ValueError("Element positions must be an (N, 2) array of [x, y] coordinates.")
+
+        weights = np.ones(len(positions)) if weights is None else np.asarray(weights)
+        if weights.shape[0] != len(positions) or weights.ndim > 2:
+            logging.error(f"Element weights with shape {weights.shape} for {len(positions)} elements")
+            raise ValueError("Element weights must be an (N,) or (N, S) array.")
+
+        self.positions = positions
+        self.weights = weights.astype(self.complex_dtype)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def block_points(self, elements, tile_budget):
+        # Points per block so that STEERING_TEMPORARIES (points, elements) complex arrays fit in the budget
+        return max(1, int(tile_budget) // (STEERING_TEMPORARIES * elements * self.complex_dtype.itemsize))
+
+    def steering_products(self, phase_of_block, points, tile_budget):
+        # Σn exp(i·phase(p, n))·w(n): blocked (points × elements) @ (elements × S) products
+        out = np.zeros((points,) + self.weights.shape[1:], dtype=self.complex_dtype)
+        for e0 in range(0, len(self), ELEMENT_BLOCK):
+            elements = slice(e0, e0 + ELEMENT_BLOCK)
+            point_block = self.block_points(min(ELEMENT_BLOCK, len(self) - e0), tile_budget)
+            for p0 in range(0, points, point_block):
+                phase = phase_of_block(slice(p0, p0 + point_block), elements)
+                out[p0:p0 + point_block] += np.exp(1j * phase) @ self.weights[elements]
+        return out
+
+    def near_field(self, grid, wavelength, tile_budget=DEFAULT_TILE_BUDGET):
+        # F(x, y) = Σ wn·exp(i·k·rn) with rn = |(x, y) - pn|, over a meshgrid
+        X_grid, Y_grid = (np.asarray(axis, dtype=self.real_dtype).ravel() for axis in grid)
+        wave_number = self.real_dtype.type(2 * np.pi / wavelength)
+        x, y = self.positions[:, 0], self.positions[:, 1]
+
+        def phase_of_block(points, elements):
+            distances = np.hypot(X_grid[points, None] - x[elements], Y_grid[points, None] - y[elements])
+            distances *= wave_number
+            return distances
+
+        field = self.steering_products(phase_of_block, X_grid.size, tile_budget)
+        return field.reshape(grid[0].shape + self.weights.shape[1:])
+
+    def wave_pattern(self, grid, wavelength, omega_t=0.0, tile_budget=DEFAULT_TILE_BUDGET):
+        # Σ |wn|·cos(k·rn + arg(wn) + ωt) = Re(F·exp(iωt)), the quantity compute_wave_pattern plots
+        return (self.near_field(grid, wavelength, tile_budget) * np.exp(1j * omega_t)).real
+
+    def far_field(self, angles, wavelength, tile_budget=DEFAULT_TILE_BUDGET):
+        # AF(θ) = Σ wn·exp(-i·k·(xn·sin(θ) + yn·cos(θ))), θ in degrees from the +Y (broadside) axis.
+        # This is the large-r limit of near_field: rn ≈ r - pn·(sin(θ), cos(θ)).
+        angles_rad = np.radians(np.asarray(angles, dtype=self.real_dtype))
+        wave_number = self.real_dtype.type(2 * np.pi / wavelength)
+        sin_theta, cos_theta = np.sin(angles_rad), np.cos(angles_rad)
+        x, y = self.positions[:, 0], self.positions[:, 1]
+
+        def phase_of_block(points, elements):
+            projection = np.multiply.outer(sin_theta[points], x[elements])
+            projection += np.multiply.outer(cos_theta[points], y[elements])
+            projection *= -wave_number
+            return projection
+
+        return self.steering_products(phase_of_block, len(angles_rad), tile_budget)
+
+    def beam_profile(self, wavelength, num_angles=DEFAULT_NUM_ANGLES, angles=None, tile_budget=DEFAULT_TILE_BUDGET):
+        # Far-field profile in dB, normalised per weight column like compute_beam_profile
+        if angles is None:
+            angles = np.linspace(-90, 90, num_angles, dtype=self.real_dtype)
+        array_factor = np.abs(self.far_field(angles, wavelength, tile_budget))
+        array_factor /= np.max(array_factor, axis=0)
+        array_factor = np.clip(array_factor, 1e-10, 1)
+        return angles, 20 * np.log10(array_factor)
+
+
+class LinearArray(ElementArray):
+    # Uniform linear preset: N elements spaced by distance along X, centred on the origin, steered to steering_angle
+    # for the wavelength the array is built for. An array of steering angles gives one weight column per angle.
+    def __init__(self, N, wavelength, steering_angle, distance, precision=None):
+        offsets = np.arange(N) - (N - 1) / 2
+        positions = np.column_stack((distance * offsets, np.zeros(N)))
+
+        # Phase shift per emitter due to steering: Δϕ = 2πd·sin(θs)/λ between adjacent emitters
+        phase_shifts = np.multiply.outer(offsets, 2 * np.pi * distance * np.sin(np.radians(steering_angle)) / wavelength)
+        super().__init__(positions, np.exp(1j * phase_shifts), precision=precision)
+        self.distance = distance
+        self.steering_wavelength = wavelength
+        self.steering_angle = steering_angle
+
+    def far_field(self, angles, wavelength, tile_budget=DEFAULT_TILE_BUDGET):
+        # Closed form of the steering-matrix product: Σn exp(i·(n - (N-1)/2)·ψ) = sin(Nψ/2) / sin(ψ/2)
+        # with ψ = 2πd·(sin(θs)/λs - sin(θ)/λ), and its limit N·cos(Nψ/2) / cos(ψ/2) where sin(ψ/2) = 0
+        N = len(self)
+        sin_theta = np.sin(np.radians(np.asarray(angles, dtype=self.real_dtype)))
+        sin_steering = np.sin(np.radians(np.asarray(self.steering_angle, dtype=self.real_dtype)))
+        half_phase = np.subtract.outer(sin_theta / self.real_dtype.type(wavelength),
+                                       sin_steering / self.real_dtype.type(self.steering_wavelength))
+        half_phase *= self.real_dtype.type(np.pi * self.distance)
+        denominator = np.sin(half_phase)
+        array_factor = N * np.cos(N * half_phase) / np.cos(half_phase)
+        np.divide(np.sin(N * half_phase), denominator, out=array_factor, where=denominator != 0)
+        return array_factor.astype(self.complex_dtype)
+
+
+def linear_array(N, wavelength, steering_angle, distance, precision=None):
+    # N elements spaced by distance along X, centred on the origin, steered to steering_angle
+    return LinearArray(N, wavelength, steering_angle, distance, precision=precision)
+
+
+def curved_array(N, wavelength, steering_angle, arc_radius=1.0, precision=None):
+    # N elements on a ±45° arc of radius arc_radius around the +Y axis, steered to steering_angle
+    emit_angles = np.linspace(-np.pi / 4, np.pi / 4, N)
+    positions = arc_radius * np.column_stack((np.sin(emit_angles), np.cos(emit_angles)))  # Polar to cartesian
+
+    # ϕn = k·R·sin(θn)·sin(θs)
+    wave_number = 2 * np.pi / wavelength
+    phase_shifts = np.multiply.outer(wave_number * positions[:, 0], np.sin(np.radians(steering_angle)))
+    return ElementArray(positions, np.exp(1j * phase_shifts), precision=precision)
+
+
+def array_from_layout(N, wavelength, steering_angle, distance, geometry="Linear", arc_radius=1.0, precision=None):
+    # The preset compute_wave_pattern draws for a geometry name
+    if geometry == "Curved":
+        return curved_array(N, wavelength, steering_angle, arc_radius, precision=precision)
+    return linear_array(N, wavelength, steering_angle, distance, precision=precision)
@@ -0,0 +1,132 @@
+import logging
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Optional: the JIT backend is only registered when numba is installed
+    numba = None
+
+logging.basicConfig(
+    filename="Logging.log",
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Registry of wave-pattern kernels. A kernel adds Σn cos(k·rn + ϕn) to out for every grid point:
+#   kernel(X_grid, Y_grid, positions, phase_shifts, wave_number, out, tile_budget)
+# "numpy" (tiled ufuncs) is the reference, every other backend must match it within CONFORMANCE_RTOL
+# (test_field_kernels.py).
+
+DEFAULT_TILE_BUDGET = 64 * 1024 * 1024  # Peak scratch bytes per tile in tiled wave pattern evaluation
+TILE_TEMPORARIES = 2  # Scratch (rows, cols, emitters) arrays alive per tile
+KERNEL_BACKEND_ENV = "BEAMFORMING_KERNEL_BACKEND"  # Environment variable selecting the default backend
+REFERENCE_BACKEND = "numpy"
+CONFORMANCE_RTOL = {'float64': 1e-9, 'float32': 1e-3}  # Allowed error relative to the emitter count
+PRECISIONS = ("float64", "float32")  # Real dtypes the compute functions run in
+DEFAULT_PRECISION = "float64"
+
+KERNEL_BACKENDS = {}
+DEFAULT_KERNEL_BACKEND = os.environ.get(KERNEL_BACKEND_ENV, REFERENCE_BACKEND)
+
+
+def resolve_precision(precision=None):
+    # Real and complex dtypes for a precision setting (None: DEFAULT_PRECISION)
+    real = np.dtype(DEFAULT_PRECISION if precision is None else precision)
+    if real.name not in PRECISIONS:
+        logging.error(f"Unsupported precision: {precision}")
+        raise ValueError(f"Precision must be one of {PRECISIONS}.")
+    return real, np.result_type(real, np.complex64)
+
+
+def compute_tile_shape(rows, cols, emitters, tile_budget, itemsize=8):
+    # A tile keeps TILE_TEMPORARIES (rows, cols, emitters) scratch arrays alive at once
+    cells = max(1, int(tile_budget) // (TILE_TEMPORARIES * itemsize))
+    emitter_block = min(emitters, cells)
+    pixels = max(1, cells // emitter_block)
+    col_block = min(cols, pixels)
+    row_block = max(1, min(rows, pixels // col_block))
+    return row_block, col_block, emitter_block
+
+
+def accumulate_wave_tiles(X_grid, Y_grid, positions, phase_shifts, wave_number, out, tile_budget=DEFAULT_TILE_BUDGET):
+    rows, cols = out.shape
+    row_block, col_block, emitter_block = compute_tile_shape(rows, cols, len(positions), tile_budget, out.itemsize)
+
+    for r0 in range(0, rows, row_block):
+        for c0 in range(0, cols, col_block):
+            X_tile = X_grid[r0:r0 + row_block, c0:c0 + col_block, None]
+            Y_tile = Y_grid[r0:r0 + row_block, c0:c0 + col_block, None]
+            out_tile = out[r0:r0 + row_block, c0:c0 + col_block]
+
+            for e0 in range(0, len(positions), emitter_block):
+                emitters = positions[e0:e0 + emitter_block]
+
+                # r = √((x - xn)² + (y - yn)²), built in place to keep only two scratch tiles alive
+                distances = X_tile - emitters[:, 0]
+                distances *= distances
+                dy = Y_tile - emitters[:, 1]
+                dy *= dy
+                distances += dy
+                del dy
+                np.sqrt(distances, out=distances)
+
+                # cos(kr + ϕ) summed over the emitters of this block
+                distances *= wave_number
+                distances += phase_shifts[e0:e0 + emitter_block]
+                np.cos(distances, out=distances)
+                out_tile += distances.sum(axis=2)
+
+    return out
+
+
+def register_backend(name, kernel):
+    KERNEL_BACKENDS[name] = kernel
+
+
+def resolve_kernel_backend(name=None):
+    # Requested (or configured) backend if registered, otherwise the NumPy reference
+    name = DEFAULT_KERNEL_BACKEND if name is None else name
+    if name not in KERNEL_BACKENDS:
+        logging.warning(f"Kernel backend '{name}' is not available, falling back to '{REFERENCE_BACKEND}'")
+        return REFERENCE_BACKEND
+    return name
+
+
+def accumulate_wave(X_grid, Y_grid, positions, phase_shifts, wave_number, out, tile_budget=DEFAULT_TILE_BUDGET,
+                    backend=None):
+    return KERNEL_BACKENDS[resolve_kernel_backend(backend)](X_grid, Y_grid, positions, phase_shifts, wave_number, out,
+                                                            tile_budget)
+
+
+register_backend(REFERENCE_BACKEND, accumulate_wave_tiles)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=False, cache=True)
+    def accumulate_wave_fused(X_grid, Y_grid, positions, phase_shifts, wave_number, out):
+        # One pass per pixel over the emitters: no temporaries, rows spread over the numba thread pool
+        rows, cols = out.shape
+        for i in numba.prange(rows):
+            for j in range(cols):
+                x = X_grid[i, j]
+                y = Y_grid[i, j]
+                total = out[i, j]
+                for n in range(positions.shape[0]):
+                    dx = x - positions[n, 0]
+                    dy = y - positions[n, 1]
+                    total += np.cos(wave_number * np.sqrt(dx * dx + dy * dy) + phase_shifts[n])
+                out[i, j] = total
+
+    def accumulate_wave_numba(X_grid, Y_grid, positions, phase_shifts, wave_number, out, tile_budget=None):
+        # tile_budget is accepted for signature compatibility, the fused loop needs no scratch memory
+        dtype = out.dtype.type
+        accumulate_wave_fused(X_grid, Y_grid, np.ascontiguousarray(positions, dtype=dtype),
+                              np.ascontiguousarray(phase_shifts, dtype=dtype), dtype(wave_number), out)
+        return out
+
+    register_backend("numba", accumulate_wave_numba)
+
+DEFAULT_KERNEL_BACKEND = resolve_kernel_backend(DEFAULT_KERNEL_BACKEND)  # Falls back once here if numba is missing
+
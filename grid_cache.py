@@ -0,0 +1,49 @@
+import logging
+
+import numpy as np
+
+from bounded_lru import BoundedLRU
+from phased_array import initialize_simulation_grid, DEFAULT_CONTEXT, DEFAULT_TILE_BUDGET
+from grid_planner import plan_grid
+
+DEFAULT_GRID_CACHE_BYTES = 256 * 1024 * 1024  # Memory cap for cached meshgrids
+BANDS_PER_OCTAVE = 4  # Frequencies within one band share a grid
+
+
+def band_frequency(frequency):
+    # Upper edge of the frequency's band: a grid built for it is at least as fine as λ/10 for the whole band
+    band = np.floor(np.log2(frequency) * BANDS_PER_OCTAVE)
+    return float(2 ** ((band + 1) / BANDS_PER_OCTAVE))
+
+
+class GridCache:
+    def __init__(self, max_bytes=DEFAULT_GRID_CACHE_BYTES):
+        self.grids = BoundedLRU(max_bytes, name="Grid cache")
+        self.plan = None  # grid_planner report of the last budgeted get()
+
+    def get(self, frequency, sizeX=5, sizeY=100, max_size=100, max_points=1000, geometry="linear",
+            context=DEFAULT_CONTEXT, N=1, mode="Emitter", memory_budget=None, latency_target=None,
+            tile_budget=DEFAULT_TILE_BUDGET, engine="tiled", parallel_backend="serial"):
+        # (grid, wavelength) like initialize_simulation_grid; the meshgrid is read-only and shared between callers.
+        # With a memory budget or latency target the planner may coarsen dx (never the precision) or raise ValueError.
+        band = band_frequency(frequency)
+        if memory_budget is not None or latency_target is not None:
+            self.plan = plan_grid(band, N, sizeX=sizeX, sizeY=sizeY, max_size=max_size, max_points=max_points,
+                                  geometry=geometry, mode=mode, memory_budget=memory_budget,
+                                  latency_target=latency_target, tile_budget=tile_budget, allow_float32=False,
+                                  engine=engine, parallel_backend=parallel_backend, context=context)
+            if self.plan['downgraded']:
+                # Planned dx in the key: quarter-octave steps, so nearby element counts still share the grid
+                context = context.replace(grid_spacing=self.plan['dx'])
+        key = (context.speed, context.grid_spacing, context.precision, band, sizeX, sizeY, max_size, max_points,
+               geometry == "Curved")
+        grid = self.grids.get(key)
+        if grid is None:
+            X_grid, Y_grid = initialize_simulation_grid(None, band, None, sizeX=sizeX, sizeY=sizeY, max_size=max_size,
+                                                        max_points=max_points, geometry=geometry, context=context)[0]
+            X_grid.flags.writeable = False
+            Y_grid.flags.writeable = False
+            grid = (X_grid, Y_grid)
+            if not self.grids.put(key, grid):
+                logging.debug(f"Grid {X_grid.shape} exceeds the grid cache, not cached")
+        return grid, context.wavelength(frequency)
@@ -0,0 +1,150 @@
+import logging
+import time
+
+import numpy as np
+
+from phased_array import accumulate_wave, resolve_kernel_backend, DEFAULT_TILE_BUDGET, TILE_TEMPORARIES, \
+    DEFAULT_CONTEXT
+from phasor_cache import DEFAULT_PHASOR_CACHE_BYTES, EMITTER_BLOCK
+
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024  # Peak bytes one map computation may use
+DX_STEPS_PER_OCTAVE = 4  # dx is coarsened in quarter-octave steps, so nearby element counts share a grid
+MAX_DX_WAVELENGTHS = 0.5  # Coarsest dx the planner will choose: λ/2, beyond it the fringes alias
+UNTILED_TEMPORARIES = 3  # (pixels, emitters) arrays alive in the untiled compute_wave_pattern path
+RECEIVER_TEMPORARIES = 4  # Full-grid arrays alive in compute_receiver_pattern
+PHASOR_TEMPORARIES = 2  # Full-grid complex arrays besides the cached fields: the accumulator and one block product
+HYBRID_BYTES_PER_POINT = 128  # Far-field lookup, phases and masks per pixel in the hybrid map (measured 90-121 bytes)
+PROCESS_SHARED_ARRAYS = 3  # Grid and output copies in shared memory for the "processes" parallel backend
+MAP_ENGINES = ("tiled", "phasor", "hybrid")  # Emitter map engines: compute_wave_pattern, the phasor cache, hybrid_map
+CALIBRATION_SHAPE = (128, 256)  # Grid used to measure the kernel throughput
+CALIBRATION_EMITTERS = 32
+
+throughput_cache = {}  # (dtype, backend) -> measured seconds per (pixel × emitter)
+
+
+def calibrate(precision=None, backend=None, context=DEFAULT_CONTEXT, repeats=3):
+    # Seconds per (pixel × emitter) of the wave-pattern kernel, measured once per precision and backend
+    real_dtype, _ = context.dtypes(precision)
+    backend = context.backend if backend is None else resolve_kernel_backend(backend)
+    key = (real_dtype.name, backend)
+    if key not in throughput_cache:
+        rng = np.random.default_rng(0)
+        X_grid, Y_grid = np.meshgrid(np.linspace(-5, 5, CALIBRATION_SHAPE[1], dtype=real_dtype),
+                                     np.linspace(0, 7, CALIBRATION_SHAPE[0], dtype=real_dtype))
+        positions = rng.uniform(-1, 1, (CALIBRATION_EMITTERS, 2)).astype(real_dtype)
+        phase_shifts = rng.uniform(-np.pi, np.pi, CALIBRATION_EMITTERS).astype(real_dtype)
+        out = np.zeros(CALIBRATION_SHAPE, dtype=real_dtype)
+        timings = []
+        for _ in range(repeats + 1):
+            start = time.perf_counter()
+            accumulate_wave(X_grid, Y_grid, positions, phase_shifts, real_dtype.type(20), out, DEFAULT_TILE_BUDGET,
+                            backend)
+            timings.append(time.perf_counter() - start)
+        # The first run pays for JIT compilation and cold caches, it is discarded
+        throughput_cache[key] = min(timings[1:]) / (out.size * CALIBRATION_EMITTERS)
+        logging.info(f"Calibrated {backend} kernel at {real_dtype.name}: {throughput_cache[key]:.3g} s per point")
+    return throughput_cache[key]
+
+
+def grid_dimensions(dx, sizeX=5, sizeY=100, max_size=100, geometry="linear"):
+    # (rows, cols) initialize_simulation_grid produces for this dx, without allocating it (np.arange counts)
+    adjusted_sizeX = max(min(sizeX, max_size), 2 * dx)
+    adjusted_sizeY = max(min(sizeY, max_size), 2 * dx)
+    rows = int(np.ceil((2 if geometry == "Curved" else 1) * adjusted_sizeY / dx))
+    return rows, int(np.ceil(2 * adjusted_sizeX / dx))
+
+
+def estimate_peak_bytes(points, N, precision, mode="Emitter", tile_budget=DEFAULT_TILE_BUDGET, engine="tiled",
+                        parallel_backend="serial", phasor_cache_bytes=DEFAULT_PHASOR_CACHE_BYTES):
+    # Meshgrid, output map and the scratch of the engine that computes it (one of MAP_ENGINES)
+    if engine not in MAP_ENGINES:
+        logging.error(f"Unknown map engine: {engine}")
+        raise ValueError(f"Map engine must be one of {MAP_ENGINES}.")
+    itemsize = np.dtype(precision).itemsize
+    resident = 3 * points * itemsize  # X_grid, Y_grid and the wave pattern
+    if mode == "Receiver":
+        return resident + RECEIVER_TEMPORARIES * points * itemsize
+
+    N = max(N, 1)
+    complex_itemsize = 2 * itemsize
+    if engine == "phasor" and N * points * complex_itemsize <= phasor_cache_bytes:
+        # N cached exp(i·k·r) fields, plus two stacked emitter blocks alive while the next one is built
+        fields = N + min(N, 2 * EMITTER_BLOCK) + PHASOR_TEMPORARIES
+        return resident + fields * points * complex_itemsize
+
+    # The tiled kernel; the phasor engine falls back to it when its fields would not fit the cache
+    if tile_budget is None:
+        scratch = UNTILED_TEMPORARIES * points * N * itemsize
+    else:
+        scratch = min(int(tile_budget), TILE_TEMPORARIES * points * N * itemsize)
+    if engine == "hybrid":
+        scratch += HYBRID_BYTES_PER_POINT * points
+    if parallel_backend == "processes":
+        scratch += PROCESS_SHARED_ARRAYS * points * itemsize
+    return resident + scratch
+
+
+def estimate_seconds(points, N, seconds_per_point, mode="Emitter"):
+    return points * (1 if mode == "Receiver" else max(N, 1)) * seconds_per_point
+
+
+def plan_grid(frequency, N=1, sizeX=5, sizeY=100, max_size=100, max_points=1000, geometry="linear", mode="Emitter",
+              memory_budget=DEFAULT_MEMORY_BUDGET, latency_target=None, tile_budget=DEFAULT_TILE_BUDGET,
+              precision=None, allow_float32=True, seconds_per_point=None, engine="tiled", parallel_backend="serial",
+              context=DEFAULT_CONTEXT):
+    # Finest dx (and precision) whose estimated peak memory fits memory_budget and whose estimated time meets
+    # latency_target. Memory is a hard limit: no fitting dx up to λ/2 raises ValueError. The latency target is
+    # soft: if even λ/2 misses it, the plan takes λ/2 and reports latency_met=False.
+    # engine and parallel_backend name the path that will compute the map, so its scratch memory is counted.
+    requested = np.dtype(context.dtypes(precision)[0]).name
+    wavelength = context.wavelength(frequency)
+    requested_dx = max(wavelength / 10 if context.grid_spacing is None else context.grid_spacing,
+                       max(sizeX, sizeY) / max_points)
+    limit_dx = max(MAX_DX_WAVELENGTHS * wavelength, requested_dx)
+
+    candidates = [requested] + (["float32"] if allow_float32 and requested != "float32" else [])
+    plans = []
+    for candidate in candidates:
+        speed = calibrate(candidate, context=context) if seconds_per_point is None else seconds_per_point
+        step = 0
+        fallback = None
+        while True:
+            dx = requested_dx * 2 ** (step / DX_STEPS_PER_OCTAVE)
+            if dx > limit_dx * (1 + 1e-9):
+                break
+            shape = grid_dimensions(dx, sizeX, sizeY, max_size, geometry)
+            points = shape[0] * shape[1]
+            plan = {
+                'dx': float(dx), 'requested_dx': float(requested_dx), 'precision': candidate,
+                'requested_precision': requested, 'shape': shape, 'points': points,
+                'peak_bytes': int(estimate_peak_bytes(points, N, candidate, mode, tile_budget, engine,
+                                                      parallel_backend)),
+                'seconds': float(estimate_seconds(points, N, speed, mode)),
+                'memory_budget': memory_budget, 'latency_target': latency_target
+            }
+            if memory_budget is None or plan['peak_bytes'] <= memory_budget:
+                fallback = plan
+                if latency_target is None or plan['seconds'] <= latency_target:
+                    break
+            step += 1
+        if fallback is not None:
+            plans.append(fallback)
+
+    if not plans:
+        logging.error(f"No grid for N={N} at {frequency} Hz fits {memory_budget} bytes, even at λ/2")
+        raise ValueError("The simulation grid does not fit the memory budget; reduce the map size or element count.")
+
+    # Finest dx wins; the requested precision wins ties, float32 is only chosen when it buys resolution
+    plan = min(plans, key=lambda candidate_plan: candidate_plan['dx'])
+    plan['latency_met'] = latency_target is None or plan['seconds'] <= latency_target
+    plan['downgraded'] = plan['dx'] > requested_dx or plan['precision'] != requested
+
+    message = (f"Grid plan: {plan['shape'][0]}x{plan['shape'][1]} at dx={plan['dx']:.4g} m, {plan['precision']}, "
+               f"~{plan['peak_bytes'] / 2 ** 20:.0f} MiB peak, ~{plan['seconds']:.3g} s")
+    if plan['downgraded']:
+        logging.warning(f"{message} (downgraded from dx={requested_dx:.4g} m, {requested})")
+    else:
+        logging.info(message)
+    if not plan['latency_met']:
+        logging.warning(f"Grid plan misses the {latency_target} s latency target even at the coarsest dx")
+    return plan
@@ -0,0 +1,181 @@
+import logging
+
+import numpy as np
+
+from element_array import ElementArray, array_from_layout
+from phased_array import DEFAULT_TILE_BUDGET, DEFAULT_CONTEXT
+from parallel_map import accumulate_wave_points
+
+HYBRID_MIN_ELEMENTS = 64  # Above this element count the GUI draws maps with the hybrid engine
+LOOKUP_OVERSAMPLE = 8  # Array-factor lookup samples per radian, per unit of k·D
+MIN_LOOKUP_ANGLES = 4096  # Lower bound on the lookup size, for small apertures
+TRANSITION_SAMPLES = 720  # Points on the transition circle used for the error report
+HYBRID_TARGET_ERROR = 0.15  # Max relative transition error the GUI accepts; ~0.13 at the Fraunhofer distance
+TRANSITION_STEPS_PER_OCTAVE = 4  # Candidate transition radii per doubling of the radius
+
+
+def fraunhofer_distance(aperture, wavelength):
+    # Far-field (Fraunhofer) distance 2D²/λ: the phase error of the plane-wave approximation stays below π/8
+    return 2 * aperture ** 2 / wavelength
+
+
+def array_aperture(positions):
+    # Largest element distance from the array centre, times two
+    centre = positions.mean(axis=0)
+    return 2 * float(np.max(np.hypot(*(positions - centre).T)))
+
+
+class FarFieldLookup:
+    # AF(θ) about the array centre, sampled over the full circle and linearly interpolated (periodic in θ)
+    def __init__(self, array, wavelength, n_angles=None, tile_budget=DEFAULT_TILE_BUDGET):
+        self.centre = array.positions.mean(axis=0)
+        aperture = array_aperture(array.positions)
+        if n_angles is None:
+            n_angles = max(MIN_LOOKUP_ANGLES, int(np.ceil(LOOKUP_OVERSAMPLE * 2 * np.pi * aperture / wavelength)))
+        self.n_angles = n_angles
+
+        centred = ElementArray(array.positions - self.centre, array.weights, precision=array.real_dtype)
+        angles = np.arange(n_angles) * (360 / n_angles) - 180  # Degrees from the +Y axis, [-180, 180)
+        self.values = centred.far_field(angles, wavelength, tile_budget)
+
+    def __call__(self, theta):
+        # theta in radians from the +Y axis
+        position = np.mod(theta + np.pi, 2 * np.pi) * (self.n_angles / (2 * np.pi))
+        lower = np.floor(position).astype(np.intp)
+        fraction = position - lower
+        lower %= self.n_angles
+        if self.values.ndim > 1:
+            fraction = fraction[:, None]
+        return self.values[lower] * (1 - fraction) + self.values[(lower + 1) % self.n_angles] * fraction
+
+    def field(self, X_points, Y_points, wavelength, spreading_distance=None):
+        # F ≈ AF(θ)·exp(i·k·r), optionally with R/r spherical spreading so the amplitude is continuous at r = R
+        dx, dy = X_points - self.centre[0], Y_points - self.centre[1]
+        r = np.hypot(dx, dy)
+        field = self(np.arctan2(dx, dy))
+        propagation = np.exp(1j * (2 * np.pi / wavelength) * r)
+        if spreading_distance is not None:
+            propagation *= spreading_distance / np.maximum(r, spreading_distance)
+        if field.ndim > 1:
+            propagation = propagation[:, None]
+        return field * propagation
+
+
+def transition_error(array, lookup, wavelength, radius, tile_budget=DEFAULT_TILE_BUDGET):
+    # Exact vs far-field value on the circle r = radius around the array centre, relative to the exact peak there
+    theta = np.linspace(-np.pi, np.pi, TRANSITION_SAMPLES, endpoint=False)
+    X_points = lookup.centre[0] + radius * np.sin(theta)
+    Y_points = lookup.centre[1] + radius * np.cos(theta)
+    exact = array.near_field((X_points, Y_points), wavelength, tile_budget)
+    approximate = lookup.field(X_points, Y_points, wavelength)
+    scale = np.max(np.abs(exact)) or 1.0
+    error = np.abs(exact - approximate) / scale
+    return float(np.max(error)), float(np.sqrt(np.mean(error ** 2)))
+
+
+def transition_radii(aperture, wavelength):
+    # Candidate radii from the array's own extent (at least λ) up to the Fraunhofer distance, in quarter octaves.
+    # The ladder does not depend on the grid, so every viewport tile of one state picks the same radius.
+    lower, upper = max(aperture / 2, wavelength), fraunhofer_distance(aperture, wavelength)
+    if lower >= upper:
+        return np.array([upper])
+    steps = int(np.ceil(TRANSITION_STEPS_PER_OCTAVE * np.log2(upper / lower)))
+    return np.append(lower * 2.0 ** (np.arange(steps) / TRANSITION_STEPS_PER_OCTAVE), upper)
+
+
+def choose_transition_radius(array, lookup, wavelength, max_radius, target_error=HYBRID_TARGET_ERROR,
+                             tile_budget=DEFAULT_TILE_BUDGET):
+    # Smallest candidate radius whose max transition error meets target_error. None when none up to max_radius
+    # does: the far field would not start inside the grid, so the whole map is exact.
+    for radius in transition_radii(array_aperture(array.positions), wavelength):
+        if radius > max_radius:
+            break
+        if transition_error(array, lookup, wavelength, radius, tile_budget)[0] <= target_error:
+            return float(radius)
+    return None
+
+
+def hybrid_report(array, lookup, wavelength, radius, near, tile_budget=DEFAULT_TILE_BUDGET):
+    aperture = array_aperture(array.positions)
+    # Without far-field points no lookup is built and there is no transition to measure
+    max_error, rms_error = (None, None) if lookup is None else transition_error(array, lookup, wavelength, radius,
+                                                                                 tile_budget)
+    report = {
+        'aperture': aperture, 'fraunhofer_distance': fraunhofer_distance(aperture, wavelength),
+        'far_field_distance': radius, 'near_points': int(near.sum()), 'far_points': int(near.size - near.sum()),
+        'lookup_angles': 0 if lookup is None else lookup.n_angles,
+        # Neglected quadratic phase term k·D²/(8R) of the plane-wave approximation: π/8 at the Fraunhofer distance
+        'phase_error_bound': float(np.pi * aperture ** 2 / (4 * wavelength * radius)) if radius > 0 else np.inf,
+        'max_transition_error': max_error, 'rms_transition_error': rms_error
+    }
+    logging.info(f"Hybrid map: {report['near_points']} exact / {report['far_points']} far-field points, "
+                 f"transition at {radius:.3f} m, max relative error "
+                 f"{'n/a' if max_error is None else f'{max_error:.3g}'}")
+    return report
+
+
+def partition_grid(array, grid, wavelength, far_field_distance=None, lookup_angles=None,
+                   tile_budget=DEFAULT_TILE_BUDGET, target_error=None):
+    # Far-field lookup (None when every point is exact), transition radius and the mask of exact points.
+    # The radius is far_field_distance if given, else the smallest meeting target_error, else the Fraunhofer distance.
+    X_grid, Y_grid = (np.asarray(axis, dtype=array.real_dtype) for axis in grid)
+    centre = array.positions.mean(axis=0)
+    radii = np.hypot(X_grid - centre[0], Y_grid - centre[1])
+    lookup = None
+    if far_field_distance is None and target_error is not None:
+        # The lookup is only worth building when a candidate radius falls inside the grid
+        if transition_radii(array_aperture(array.positions), wavelength)[0] <= radii.max():
+            lookup = FarFieldLookup(array, wavelength, lookup_angles, tile_budget)
+            far_field_distance = choose_transition_radius(array, lookup, wavelength, radii.max(), target_error,
+                                                          tile_budget)
+    if far_field_distance is None:
+        far_field_distance = fraunhofer_distance(array_aperture(array.positions), wavelength)
+    near = radii < far_field_distance
+    if lookup is None and not near.all():
+        lookup = FarFieldLookup(array, wavelength, lookup_angles, tile_budget)
+    return X_grid, Y_grid, lookup, far_field_distance, near
+
+
+def compute_hybrid_field(array, grid, wavelength, far_field_distance=None, spreading=False, lookup_angles=None,
+                         tile_budget=DEFAULT_TILE_BUDGET, target_error=None):
+    # Complex map: exact spherical-wave sum for r < far_field_distance, array-factor lookup beyond it.
+    # Returns the field and a report with the transition error bounds.
+    X_grid, Y_grid, lookup, radius, near = partition_grid(array, grid, wavelength, far_field_distance,
+                                                          lookup_angles, tile_budget, target_error)
+    field = np.empty(X_grid.shape + array.weights.shape[1:], dtype=array.complex_dtype)
+    if near.any():
+        field[near] = array.near_field((X_grid[near], Y_grid[near]), wavelength, tile_budget)
+    if not near.all():
+        far = ~near
+        field[far] = lookup.field(X_grid[far], Y_grid[far], wavelength, radius if spreading else None)
+    return field, hybrid_report(array, lookup, wavelength, radius, near, tile_budget)
+
+
+def compute_wave_pattern_hybrid(N, frequency, steering_angle, distance, grid, t=0, geometry="Linear", arc_radius=1.0,
+                                far_field_distance=None, spreading=False, tile_budget=DEFAULT_TILE_BUDGET,
+                                precision=None, target_error=None, parallel_backend="serial", workers=None,
+                                context=DEFAULT_CONTEXT):
+    # compute_wave_pattern for large arrays: O(pixels × N) only inside the far-field distance.
+    # The exact region uses the real cos(k·r + ϕ) accumulation, which is cheaper than the complex field,
+    # spread over parallel_backend ("serial", "threads" or "processes") like compute_wave_pattern_parallel.
+    wavelength = context.wavelength(frequency)
+    array = array_from_layout(N, wavelength, steering_angle, distance, geometry, arc_radius,
+                              precision=grid[0].dtype if precision is None else precision)
+    X_grid, Y_grid, lookup, radius, near = partition_grid(array, grid, wavelength, far_field_distance,
+                                                          tile_budget=tile_budget, target_error=target_error)
+    omega_t = 2 * np.pi * frequency * t
+
+    wave_pattern = np.empty(X_grid.shape, dtype=array.real_dtype)
+    if near.any():
+        exact = np.zeros(int(near.sum()), dtype=array.real_dtype)
+        phase_shifts = (np.angle(array.weights) + omega_t).astype(array.real_dtype)
+        accumulate_wave_points(X_grid[near], Y_grid[near], array.positions, phase_shifts,
+                               array.real_dtype.type(2 * np.pi / wavelength), exact, parallel_backend, workers,
+                               tile_budget, context.backend)
+        wave_pattern[near] = exact
+    if not near.all():
+        far = ~near
+        field = lookup.field(X_grid[far], Y_grid[far], wavelength, radius if spreading else None)
+        wave_pattern[far] = (field * np.exp(1j * omega_t)).real
+
+    return wave_pattern, array.positions, hybrid_report(array, lookup, wavelength, radius, near, tile_budget)
@@ -2,23 +2,30 @@ import sys
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import (
     QMainWindow, QApplication, QVBoxLayout, QHBoxLayout, QGroupBox,
-    QWidget, QLabel, QSlider, QPushButton, QComboBox, QSpinBox
+    QWidget, QLabel, QSlider, QPushButton, QComboBox, QSpinBox, QFileDialog, QCheckBox
 )
 import os 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from BeamFormingSystem import BeamForming
 import numpy as np
 from mainStyle import sliderStyle
-from mainStyle import mainStyle, sliderStyle, groupBoxStyle , buttonStyle, spinBoxStyle, comboBoxStyle,darkColor,sliderDisabledStyle
-from phased_array import set_speed, SPEED_OF_LIGHT, SPEED_OF_SOUND_TISSUE, SPEED_OF_SOUND_AIR, GRID_FACTOR,initialize_simulation_grid
+from mainStyle import mainStyle, sliderStyle, groupBoxStyle , buttonStyle, spinBoxStyle, comboBoxStyle,darkColor,sliderDisabledStyle,greenColor
+from phased_array import SPEED_OF_LIGHT, SPEED_OF_SOUND_TISSUE, SPEED_OF_SOUND_AIR, GRID_FACTOR
+from wave_animation import DEFAULT_FRAME_RATE
+from perf_stats import recorder
+from simulation_worker import SimulationWorker
 from PyQt5.QtGui import QIcon
 import logging
 for handler in logging.getLogger().handlers[:]:
     logging.getLogger().removeHandler(handler)
 
+REFINE_IDLE_MS = 250  # Idle time after the last slider change before the full-resolution refinement
+VIEWPORT_IDLE_MS = 150  # Idle time after the last zoom or pan step before the visible window is recomputed
+MAX_EMITTERS = 1024  # Transmitter count cap; maps above HYBRID_MIN_ELEMENTS use the hybrid near/far-field engine
+
 logging.basicConfig(
     filename="Logging.log",
     level=logging.INFO,
@@ -45,8 +52,15 @@ class Main(QMainWindow):
         self.styleUi()
 
         self.controller = BeamForming(self.beam_profile_canvas.figure,
-                                      [self.constructive_map_canvas.figure.gca(), self.beam_profile_canvas.figure.gca()],
+                                      [self.constructive_map_canvas.figure.gca(), self.beam_profile_canvas.figure.gca(),
+                                       self.steering_map_canvas.figure.gca()],
                                       self.initial_state)
+        self.simulation_worker = SimulationWorker(self.controller.compute_results, self)
+        self.simulation_worker.result_ready.connect(self.on_simulation_result)
+        # Zoom and pan recompute only the visible window, on its own worker so it never delays a parameter change
+        self.viewport_worker = SimulationWorker(self.controller.compute_viewport, self)
+        self.viewport_worker.result_ready.connect(self.on_viewport_result)
+        self.controller.set_limits_listener(lambda ax: self.viewport_timer.start())
         self.update_plot()
 
     def createUIElements(self):
@@ -79,7 +93,7 @@ class Main(QMainWindow):
 
         self.emitters_label = QLabel("Transmitters Number:")
         self.emitters_spinbox = QSpinBox()
-        self.emitters_spinbox.setRange(2, 64)
+        self.emitters_spinbox.setRange(2, MAX_EMITTERS)
         self.emitters_spinbox.setValue(2)
 
         self.geometry_label = QLabel("Geometry:")
@@ -97,6 +111,31 @@ class Main(QMainWindow):
         self.scenario_dropdown = QComboBox()
         self.scenario_dropdown.addItems(["Default Mode","5G_Receiver Mode", "Ultrasound", "Tumor Ablation","5G_Transmitter Mode"])
 
+        self.animate_button = QPushButton("Animate")
+        self.animate_button.setCheckable(True)
+        self.export_frames_button = QPushButton("Export Frames")
+        self.animation_timer = QTimer(self)
+        self.animation_timer.setInterval(int(1000 / DEFAULT_FRAME_RATE))
+
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(REFINE_IDLE_MS)
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(VIEWPORT_IDLE_MS)
+
+        self.render_mode_label = QLabel("Map Rendering:")
+        self.render_mode_dropdown = QComboBox()
+        self.render_mode_dropdown.addItems(["Fast", "High Quality"])
+        self.precision_label = QLabel("Precision:")
+        self.precision_dropdown = QComboBox()
+        self.precision_dropdown.addItems(["Double (float64)", "Single (float32)"])
+        self.backend_label = QLabel("Map Compute:")
+        self.backend_dropdown = QComboBox()
+        self.backend_dropdown.addItems(["Serial", "Threads", "Processes"])
+        self.hud_checkbox = QCheckBox("Performance HUD")
+        self.save_timings_button = QPushButton("Save Timings")
+
         #Graphs 
         self.constructive_map_canvas = FigureCanvas(plt.figure(figsize=(7, 4)))
         self.constructive_map_toolbar = NavigationToolbar(self.constructive_map_canvas, self)
@@ -115,6 +154,9 @@ class Main(QMainWindow):
         self.beam_profile_canvas = FigureCanvas(plt.figure(figsize=(7, 4)))
         self.beam_profile_canvas.figure.add_subplot(111, polar=True) 
 
+        self.steering_map_canvas = FigureCanvas(plt.figure(figsize=(4, 4)))
+        self.steering_map_canvas.figure.add_subplot(111)
+
     def layoutSet(self):
         controlBar_layout = QVBoxLayout()
 
@@ -147,6 +189,19 @@ class Main(QMainWindow):
             self.scenario_label, self.scenario_dropdown
         ]))
 
+        # Animation
+        controlBar_layout.addWidget(self.createCompactGroupBox("Animation", [
+            self.animate_button, self.export_frames_button
+        ]))
+
+        # Performance
+        controlBar_layout.addWidget(self.createCompactGroupBox("Performance", [
+            self.createComboBox(self.render_mode_label, self.render_mode_dropdown),
+            self.createComboBox(self.precision_label, self.precision_dropdown),
+            self.createComboBox(self.backend_label, self.backend_dropdown),
+            self.hud_checkbox, self.save_timings_button
+        ]))
+
         controlBar = QWidget()
         controlBar.setLayout(controlBar_layout)
        
@@ -164,7 +219,10 @@ class Main(QMainWindow):
 
         graphsBar_layout.addWidget(self.constructive_map_canvas)
         graphsBar_layout.addWidget(QLabel("Beam Profile Viewer"))
-        graphsBar_layout.addWidget(self.beam_profile_canvas)
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(self.beam_profile_canvas, 3)
+        profile_layout.addWidget(self.steering_map_canvas, 2)
+        graphsBar_layout.addLayout(profile_layout)
 
         graphsBar = QWidget()
         graphsBar.setLayout(graphsBar_layout)
@@ -187,8 +245,16 @@ class Main(QMainWindow):
         self.curvature_slider.setStyleSheet(sliderStyle)
         self.emitters_spinbox.setStyleSheet(spinBoxStyle)
         self.scenario_dropdown.setStyleSheet(comboBoxStyle)
+        self.animate_button.setStyleSheet(buttonStyle)
+        self.export_frames_button.setStyleSheet(buttonStyle)
+        self.save_timings_button.setStyleSheet(buttonStyle)
+        self.render_mode_dropdown.setStyleSheet(comboBoxStyle)
+        self.precision_dropdown.setStyleSheet(comboBoxStyle)
+        self.backend_dropdown.setStyleSheet(comboBoxStyle)
+        self.hud_checkbox.setStyleSheet(f"color: {greenColor};")
         self.constructive_map_canvas.figure.set_facecolor(darkColor) 
         self.beam_profile_canvas.figure.set_facecolor(darkColor) 
+        self.steering_map_canvas.figure.set_facecolor(darkColor)
 
     def initializeParameters(self):
         self.ultrasound_freq_range = (20000, 50000)
@@ -217,6 +283,11 @@ class Main(QMainWindow):
         self.mode_dropdown.currentTextChanged.connect(self.update_mode)
         
 
+        self.frequency_slider.valueChanged.connect(self.preview_plot)
+        self.phase_slider.valueChanged.connect(self.preview_plot)
+        self.refine_timer.timeout.connect(self.update_plot)
+        self.viewport_timer.timeout.connect(self.update_viewport)
+
         self.frequency_slider.sliderReleased.connect(self.update_plot)
         self.phase_slider.sliderReleased.connect(self.update_plot)
         self.distance_slider.sliderReleased.connect(self.update_plot)
@@ -226,6 +297,16 @@ class Main(QMainWindow):
 
         self.scenario_dropdown.currentIndexChanged.connect(self.choose_scenario)
 
+        self.animate_button.toggled.connect(self.toggle_animation)
+        self.animation_timer.timeout.connect(self.show_next_frame)
+        self.export_frames_button.clicked.connect(self.export_animation)
+
+        self.render_mode_dropdown.currentTextChanged.connect(self.update_render_mode)
+        self.precision_dropdown.currentTextChanged.connect(self.update_precision)
+        self.backend_dropdown.currentTextChanged.connect(self.update_backend)
+        self.hud_checkbox.toggled.connect(self.toggle_hud)
+        self.save_timings_button.clicked.connect(self.save_timings)
+
     def update_mode(self, mode):
         if mode == "Receiver":
             self.reset_to_receiver_mode()
@@ -243,7 +324,7 @@ class Main(QMainWindow):
             self.parameters_box.insertWidget(3, self.curvature_widget)  
             self.distance_label.setText("Transmitter Position:")
             self.emitters_label.setText("Transmitters Number:")
-            self.emitters_spinbox.setRange(2, 64)
+            self.emitters_spinbox.setRange(2, MAX_EMITTERS)
             self.curvature_slider.setEnabled(True)
         logging.info("Mode changed to: %s", mode)
         self.update_plot()
@@ -257,12 +338,12 @@ class Main(QMainWindow):
 
         self.update_plot()
 
-    def update_plot(self):
+    def collect_state(self):
         mode = self.mode_dropdown.currentText()
         self.initial_state['scenario'] = self.scenario_dropdown.currentText()  
 
         if mode == "Receiver":
-            self.controller.update_state(
+            self.controller.set_state(
             mode=mode,
             receiver_count=self.emitters_spinbox.value(),
             receiver_spacing=self.distance_slider.value() / 100,
@@ -271,7 +352,7 @@ class Main(QMainWindow):
     )
 
         else: 
-            self.controller.update_state(
+            self.controller.set_state(
                 mode=mode,
                 N=self.emitters_spinbox.value(),
                 f=self.frequency_slider.value(),
@@ -280,29 +361,135 @@ class Main(QMainWindow):
                 geometry=self.initial_state['geometry'], 
                 curvature=self.curvature_slider.value() / 10
             )
-        self.constructive_map_canvas.draw()
-        self.beam_profile_canvas.draw()
+
+    def update_plot(self):
+        self.refine_timer.stop()
+        self.collect_state()
+        self.viewport_worker.supersede()
+        # The simulation runs on the worker thread, only the newest state is ever rendered
+        self.simulation_worker.submit(self.controller.state, self.controller.update_grid())
+
+    def preview_plot(self):
+        # While a slider is dragged: coarse preview right away, full resolution on release or after an idle pause
+        self.refine_timer.start()
+        sliders = (self.frequency_slider, self.phase_slider, self.distance_slider, self.curvature_slider)
+        if not any(slider.isSliderDown() for slider in sliders):
+            return
+
+        self.collect_state()
+        self.controller.update_grid()
+        self.simulation_worker.supersede()
+        self.viewport_worker.supersede()
+        with recorder.span('preview', **self.controller.span_tags()):
+            self.controller.render_results(self.controller.compute_preview())
+            self.controller.draw_map()
+            self.controller.draw_profile()
+
+    def on_simulation_result(self, generation, results):
+        if not self.simulation_worker.is_latest(generation):
+            return
+
+        tags = self.controller.span_tags()
+        with recorder.span('render', **tags):
+            self.controller.render_results(results)
+        self.controller.update_hud()
+
+        with recorder.span('draw.map', **tags):
+            self.controller.draw_map()
+        with recorder.span('draw.beam_profile', **tags):
+            self.controller.draw_profile()
+        with recorder.span('draw.steering_map', **tags):
+            self.steering_map_canvas.draw()
+        # A new full map replaces the zoomed window, fetch the window for the new state
+        self.update_viewport()
+
+    def update_viewport(self):
+        viewport = self.controller.zoomed_viewport()
+        if viewport is None:
+            self.viewport_worker.supersede()
+            if self.controller.viewport is not None:
+                self.controller.reset_viewport()
+                self.controller.draw_map()
+            return
+        if viewport != self.controller.viewport:
+            self.viewport_worker.submit(self.controller.state, viewport)
+
+    def on_viewport_result(self, generation, results):
+        if not self.viewport_worker.is_latest(generation):
+            return
+        with recorder.span('render.viewport', **self.controller.span_tags()):
+            self.controller.render_viewport(results)
+            self.controller.draw_map()
+
+    def update_render_mode(self, text):
+        # Fast: in-place image updates with blitting; High Quality: 50-level filled contours
+        self.controller.set_state(render_mode='contour' if text == "High Quality" else 'image')
+        self.update_plot()
+
+    def update_precision(self, text):
+        # Single precision halves memory traffic; the beam profile stays within ~0.1 dB of double precision
+        self.simulation_worker.supersede()
+        self.controller.set_precision('float32' if text.startswith("Single") else 'float64')
+        self.update_plot()
+
+    def update_backend(self, text):
+        # Serial uses the phasor cache; Threads/Processes split the grid into row bands on all cores
+        self.controller.set_state(parallel_backend=text.lower())
+        self.update_plot()
+
+    def toggle_hud(self, visible):
+        self.controller.set_hud_visible(visible)
+        self.controller.draw_map()
+
+    def save_timings(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Latency Histograms", "timings.json", "JSON files (*.json)")
+        if path:
+            recorder.dump_json(path)
+
+    def toggle_animation(self, running):
+        if running:
+            # The worker computes the complex field along with the map, render_results then starts the frames
+            self.controller.set_state(animate=True)
+            self.animation_timer.start()
+            self.animate_button.setText("Stop")
+            self.update_plot()
+        else:
+            self.animation_timer.stop()
+            self.controller.set_state(animate=False)
+            self.controller.stop_animation()
+            self.animate_button.setText("Animate")
+            self.controller.draw_map()
+        logging.info(f"Animation {'started' if running else 'stopped'}")
+
+    def show_next_frame(self):
+        self.controller.next_animation_frame()
+        self.controller.draw_map()
+
+    def export_animation(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Animation Frames", "frames.npy", "NumPy files (*.npy)")
+        if path:
+            self.controller.export_animation(path)
 
     def update_distance_and_geometry(self):
         self.distance_value.setText(f"{self.distance_slider.value() / 100:.3f}")
         self.initial_state['geometry'] ="Linear"
-        self.update_plot()
+        self.preview_plot()
 
 
 
     def update_curvature_and_geometry(self):
         self.curvature_value.setText(f"{self.curvature_slider.value() / 10:.1f}")
         self.initial_state['geometry'] ="Curved"
-        self.update_plot()
+        self.preview_plot()
 
     def choose_scenario(self):
         scenario = self.scenario_dropdown.currentText()
         logging.info(f"Loaded scenario: {scenario}")
         self.initial_state['scenario'] = scenario
-        self.controller.update_state(scenario=scenario)
+        self.controller.set_state(scenario=scenario)
         sizeY=7
         if scenario == "5G_Transmitter Mode":
-            set_speed(SPEED_OF_LIGHT)
+            self.controller.set_context(speed=SPEED_OF_LIGHT)
             self.mode_dropdown.setCurrentText("Transmitter")
             self.frequency_slider.setRange(200000000, 600000000)
             self.frequency_slider.setValue(40000000)
@@ -315,7 +502,7 @@ class Main(QMainWindow):
             sizeY = 3
             max_points=1000000
         elif scenario == "Ultrasound":
-            set_speed(SPEED_OF_SOUND_TISSUE)
+            self.controller.set_context(speed=SPEED_OF_SOUND_TISSUE)
 
             self.mode_dropdown.setCurrentText("Transmitter")
             self.frequency_slider.setRange(self.ultrasound_freq_range[0], self.ultrasound_freq_range[1])
@@ -333,7 +520,7 @@ class Main(QMainWindow):
             lambda: self.frequency_value.setText(str(self.frequency_slider.value() * GRID_FACTOR)))
             
         elif scenario == "Tumor Ablation":
-            set_speed(SPEED_OF_SOUND_TISSUE)
+            self.controller.set_context(speed=SPEED_OF_SOUND_TISSUE)
 
             self.mode_dropdown.setCurrentText("Transmitter")
             self.frequency_slider.setRange(self.tumor_freq_range[0], self.tumor_freq_range[1])
@@ -364,20 +551,14 @@ class Main(QMainWindow):
             max_points=1000
             
         
-        self.controller.grid, self.controller.wavelength = initialize_simulation_grid(
-        self.controller.state['N'],
-        self.controller.state['f'],
-        self.controller.state['distance'],
-        sizeX=sizeX,
-        sizeY=sizeY,
-        max_points=max_points,
-        geometry=self.initial_state['geometry']
-    )
+        # The grid itself is fetched from the controller's grid cache once the new slider values are collected
+        self.controller.set_state(sizeX=sizeX, sizeY=sizeY, max_points=max_points,
+                                  geometry=self.initial_state['geometry'])
         self.update_mode(self.mode_dropdown.currentText())
         self.update_plot()
 
     def reset_to_default_mode(self):
-        set_speed(SPEED_OF_SOUND_AIR)
+        self.controller.set_context(speed=SPEED_OF_SOUND_AIR)
         self.mode_dropdown.setCurrentText("Transmitter")
         self.scenario_dropdown.setCurrentText("Default Mode")
         self.frequency_slider.setRange(500, 5000)
@@ -389,7 +570,7 @@ class Main(QMainWindow):
 
     def reset_to_receiver_mode(self):
         self.scenario_dropdown.setCurrentText("5G_Receiver Mode")
-        set_speed(self.speed_of_receiver)
+        self.controller.set_context(speed=self.speed_of_receiver)
         self.frequency_slider.setRange(self.receiver_freq_range[0], self.receiver_freq_range[1])
         
         self.frequency_slider.setValue(self.receiver_freq_default)
@@ -405,6 +586,12 @@ class Main(QMainWindow):
         self.initial_state['geometry'] = "Linear"
     
 
+    def closeEvent(self, event):
+        self.animation_timer.stop()
+        self.simulation_worker.stop()
+        self.viewport_worker.stop()
+        super().closeEvent(event)
+
     def createGroupBox(self, title, layout):
         groupbox = QGroupBox(title)
         groupbox_layout = QVBoxLayout()
@@ -0,0 +1,233 @@
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+from phased_array import compute_grid_axes, compute_emitter_layout, accumulate_wave, SimulationContext, \
+    SPEED_OF_SOUND_AIR, DEFAULT_TILE_BUDGET, DEFAULT_CONTEXT
+
+# Interference maps larger than RAM: the grid is kept as its two axis vectors, the map is computed in row bands
+# straight into a memory-mapped .npy file, and a pyramid of 2× downsampled overviews is built band by band.
+# Example: python out_of_core.py --N 64 --f 2000 --max-points 1000000 --out maps/5g
+
+DEFAULT_BAND_BYTES = 64 * 1024 * 1024  # Map rows computed and downsampled per band
+OVERVIEW_MAX_SIZE = 1024  # The coarsest overview fits in this many pixels per side
+MANIFEST_NAME = "map.json"
+MAP_NAME = "map.npy"
+AXES_NAME = "axes.npz"
+
+
+def overview_name(level):
+    return f"overview_{level}.npy"
+
+
+def overview_levels(shape, max_size=OVERVIEW_MAX_SIZE):
+    # Number of 2× reductions until the map fits in max_size pixels per side
+    return max(0, int(np.ceil(np.log2(max(shape) / max_size))))
+
+
+def downsample(band, factor):
+    # Block mean over factor × factor pixels; the last block in each direction may be partial
+    rows, cols = band.shape
+    row_starts, col_starts = np.arange(0, rows, factor), np.arange(0, cols, factor)
+    sums = np.add.reduceat(np.add.reduceat(band, row_starts, axis=0, dtype=np.float64), col_starts, axis=1)
+    counts = np.outer(np.diff(np.r_[row_starts, rows]), np.diff(np.r_[col_starts, cols]))
+    return (sums / counts).astype(band.dtype)
+
+
+def band_rows(cols, itemsize, band_bytes=DEFAULT_BAND_BYTES):
+    # Rows per band that fit band_bytes; at least one
+    return max(1, int(band_bytes) // (cols * itemsize))
+
+
+def reduce_rows(carry, rows, final):
+    # 2× block mean of rows continuing an image whose last row (carry) is still waiting for its pair.
+    # Returns (reduced rows, new carry); with final set, a leftover row becomes a partial block instead.
+    parts = []
+    if carry is not None and len(rows):
+        parts.append(downsample(np.concatenate([carry, rows[:1]]), 2))
+        rows = rows[1:]
+        carry = None
+    elif carry is not None and final:
+        parts.append(downsample(carry, 2))
+        carry = None
+    paired = len(rows) if final else len(rows) // 2 * 2
+    if paired:
+        parts.append(downsample(rows[:paired], 2))
+    if paired < len(rows):
+        carry = rows[paired:].copy()  # The band buffer is reused, so the leftover row is copied out
+    if not parts:
+        return rows[:0, ::2], carry
+    return np.concatenate(parts), carry
+
+
+def write_manifest(out_dir, options):
+    # Resume bookkeeping as in sweep.py: the manifest pins the parameters, rows_done records the progress
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as file:
+            previous = json.load(file)
+        if previous['options'] != options:
+            raise ValueError(f"{out_dir} holds a different map; use a new --out directory to start over.")
+        return previous
+    manifest = {'options': options, 'rows_done': 0}
+    save_manifest(out_dir, manifest)
+    return manifest
+
+
+def save_manifest(out_dir, manifest):
+    temporary_path = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(temporary_path, "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temporary_path, os.path.join(out_dir, MANIFEST_NAME))
+
+
+def open_array(path, shape, dtype, resume):
+    if resume and os.path.exists(path):
+        return np.load(path, mmap_mode='r+')
+    return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+
+
+def compute_map_out_of_core(out_dir, N, frequency, steering_angle, distance, sizeX=5, sizeY=100, max_size=100,
+                            max_points=1000, geometry="Linear", arc_radius=1.0, band_bytes=DEFAULT_BAND_BYTES,
+                            tile_budget=DEFAULT_TILE_BUDGET, precision=None, context=DEFAULT_CONTEXT):
+    # compute_wave_pattern into out_dir/map.npy, band by band; rerunning with the same arguments resumes.
+    # Peak memory is one band plus the kernel's tile budget, whatever the map size: bands follow band_bytes and
+    # each overview level carries at most one row over to the next band.
+    options = {
+        'N': N, 'f': frequency, 'direction': steering_angle, 'distance': distance, 'size_x': sizeX, 'size_y': sizeY,
+        'max_size': max_size, 'max_points': max_points, 'geometry': geometry, 'curvature': arc_radius,
+        'speed': context.speed, 'grid_spacing': context.grid_spacing,
+        'precision': np.dtype(context.dtypes(precision)[0]).name
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = write_manifest(out_dir, options)
+
+    (x_axis, y_axis), wavelength = compute_grid_axes(frequency, sizeX=sizeX, sizeY=sizeY, max_size=max_size,
+                                                     max_points=max_points, geometry=geometry, precision=precision,
+                                                     context=context)
+    real_dtype = x_axis.dtype
+    shape = (len(y_axis), len(x_axis))
+    levels = overview_levels(shape)
+    rows_per_band = band_rows(shape[1], real_dtype.itemsize, band_bytes)
+    np.savez(os.path.join(out_dir, AXES_NAME), x=x_axis, y=y_axis)
+
+    resume = manifest['rows_done'] > 0
+    wave_map = open_array(os.path.join(out_dir, MAP_NAME), shape, real_dtype, resume)
+    overviews = [open_array(os.path.join(out_dir, overview_name(level)),
+                            (-(-shape[0] // 2 ** level), -(-shape[1] // 2 ** level)), real_dtype, resume)
+                 for level in range(1, levels + 1)]
+
+    positions, phase_shifts = compute_emitter_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+    positions = positions.astype(real_dtype)
+    phase_shifts = phase_shifts.astype(real_dtype)
+    wave_number = real_dtype.type(2 * np.pi / wavelength)
+    # The overview carries are not saved, so a resumed run restarts at a row where every level's carry is empty
+    start = manifest['rows_done'] // 2 ** levels * 2 ** levels
+    logging.info(f"Out-of-core map {shape} in {out_dir}: {rows_per_band} rows per band, {levels} overview levels, "
+                 f"resuming at row {start}")
+
+    band = np.empty((rows_per_band, shape[1]), dtype=real_dtype)
+    carries = [None] * levels
+    written = [start // 2 ** level for level in range(1, levels + 1)]  # Overview rows on disk per level
+    for r0 in range(start, shape[0], rows_per_band):
+        rows = min(rows_per_band, shape[0] - r0)
+        out = band[:rows]
+        out[...] = 0
+        # Broadcast views of the axes stand in for the meshgrid: no grid memory at all
+        X_band = np.broadcast_to(x_axis[None, :], out.shape)
+        Y_band = np.broadcast_to(y_axis[r0:r0 + rows, None], out.shape)
+        accumulate_wave(X_band, Y_band, positions, phase_shifts, wave_number, out, tile_budget, context.backend)
+        wave_map[r0:r0 + rows] = out
+
+        # Overview rows completed by this band; rows waiting for their pair are carried to the next band
+        reduced, final = out, r0 + rows == shape[0]
+        for level, overview in enumerate(overviews):
+            reduced, carries[level] = reduce_rows(carries[level], reduced, final)
+            overview[written[level]:written[level] + len(reduced)] = reduced
+            written[level] += len(reduced)
+
+        # Progress is only recorded once the band is on disk, so an interrupted run redoes at most one band
+        wave_map.flush()
+        for overview in overviews:
+            overview.flush()
+        manifest['rows_done'] = r0 + rows
+        save_manifest(out_dir, manifest)
+        logging.debug(f"Out-of-core map: {r0 + rows}/{shape[0]} rows")
+
+    del wave_map, overviews
+    logging.info(f"Out-of-core map finished in {out_dir}")
+    return OutOfCoreMap(out_dir)
+
+
+class OutOfCoreMap:
+    # A finished map reopened read-only: the full-resolution memmap, its axes and the overview pyramid
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as file:
+            self.manifest = json.load(file)
+        self.out_dir = out_dir
+        axes = np.load(os.path.join(out_dir, AXES_NAME))
+        self.x, self.y = axes['x'], axes['y']
+        self.map = np.load(os.path.join(out_dir, MAP_NAME), mmap_mode='r')
+        if self.manifest['rows_done'] < self.map.shape[0]:
+            logging.warning(f"Out-of-core map in {out_dir} is incomplete: "
+                            f"{self.manifest['rows_done']}/{self.map.shape[0]} rows")
+        self.overviews = [self.map]
+        for level in range(1, overview_levels(self.map.shape) + 1):
+            self.overviews.append(np.load(os.path.join(out_dir, overview_name(level)), mmap_mode='r'))
+
+    @property
+    def extent(self):
+        return [float(self.x[0]), float(self.x[-1]), float(self.y[0]), float(self.y[-1])]
+
+    def overview(self, max_size=OVERVIEW_MAX_SIZE):
+        # Finest pyramid level with at most max_size pixels per side
+        for level in self.overviews:
+            if max(level.shape) <= max_size:
+                return level
+        return self.overviews[-1]
+
+    def region(self, x_range, y_range, max_size=OVERVIEW_MAX_SIZE):
+        # Part of the map inside the given limits, read from the finest level that keeps it within max_size
+        columns = np.searchsorted(self.x, x_range)
+        rows = np.searchsorted(self.y, y_range)
+        for level, data in enumerate(self.overviews):
+            factor = 2 ** level
+            if max(np.diff(rows)[0], np.diff(columns)[0]) // factor <= max_size:
+                break
+        return np.asarray(data[rows[0] // factor:-(-rows[1] // factor), columns[0] // factor:-(-columns[1] // factor)])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Out-of-core interference map into memory-mapped tiles")
+    parser.add_argument("--N", type=int, default=16, help="Element count")
+    parser.add_argument("--f", type=float, default=500, help="Frequency (Hz)")
+    parser.add_argument("--direction", type=float, default=0, help="Steering angle (°)")
+    parser.add_argument("--distance", type=float, default=0.1, help="Element spacing (m)")
+    parser.add_argument("--curvature", type=float, default=1.0, help="Arc radius for the Curved geometry (m)")
+    parser.add_argument("--geometry", default="Linear", help="Linear or Curved")
+    parser.add_argument("--speed", type=float, default=SPEED_OF_SOUND_AIR, help="Propagation speed (m/s)")
+    parser.add_argument("--size-x", type=float, default=5, help="Map half-width (m)")
+    parser.add_argument("--size-y", type=float, default=7, help="Map depth (m)")
+    parser.add_argument("--max-points", type=int, default=1000000, help="Map resolution cap")
+    parser.add_argument("--precision", default="float32", help="float32 or float64")
+    parser.add_argument("--band-mb", type=float, default=DEFAULT_BAND_BYTES / 2 ** 20, help="Rows per band, in MiB")
+    parser.add_argument("--out", required=True, help="Output directory; rerun with the same one to resume")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    context = SimulationContext(speed=args.speed, precision=args.precision)
+    print(f"Computing the interference map into {args.out}")
+    result = compute_map_out_of_core(args.out, args.N, args.f, args.direction, args.distance, sizeX=args.size_x,
+                                     sizeY=args.size_y, max_points=args.max_points, geometry=args.geometry,
+                                     arc_radius=args.curvature, band_bytes=args.band_mb * 2 ** 20, context=context)
+    print(f"Map {result.map.shape} with {len(result.overviews) - 1} overview levels written to {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import atexit
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from phased_array import compute_emitter_layout, compute_wave_pattern, accumulate_wave, DEFAULT_TILE_BUDGET, \
+    DEFAULT_CONTEXT
+
+PARALLEL_BACKENDS = ("serial", "threads", "processes")
+MIN_PARALLEL_WORK = 4 * 1024 * 1024  # Pixels × emitters below which the serial path is faster than any pool
+
+thread_pools = {}  # workers -> ThreadPoolExecutor, kept alive between maps
+process_pools = {}  # workers -> ProcessPoolExecutor (spawn context: safe next to the Qt and simulation threads)
+
+
+def default_workers():
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def row_bands(rows, workers):
+    # Contiguous, near-equal row ranges, one per worker
+    edges = np.linspace(0, rows, min(workers, rows) + 1).astype(int)
+    return [(start, stop) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+def get_pool(backend, workers):
+    pools = thread_pools if backend == "threads" else process_pools
+    if workers not in pools:
+        if backend == "threads":
+            pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wave-band")
+        else:
+            pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return pools[workers]
+
+
+@atexit.register
+def shutdown_pools():
+    for pool in list(thread_pools.values()) + list(process_pools.values()):
+        pool.shutdown(wait=False, cancel_futures=True)
+    thread_pools.clear()
+    process_pools.clear()
+
+
+def shared_array(shape, dtype, source=None):
+    # ndarray backed by a new shared-memory block, optionally filled from source
+    block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    if source is None:
+        array[...] = 0
+    else:
+        array[...] = source
+    return block, array
+
+
+def accumulate_shared_band(names, shape, dtype, band, positions, phase_shifts, wave_number, tile_budget,
+                           kernel_backend=None):
+    # Process worker: attach to the shared grid and output, fill rows [start, stop) in place, return nothing
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        X_grid, Y_grid, out = (np.ndarray(shape, dtype=dtype, buffer=block.buf) for block in blocks)
+        start, stop = band
+        accumulate_wave(X_grid[start:stop], Y_grid[start:stop], positions, phase_shifts, wave_number,
+                        out[start:stop], tile_budget, kernel_backend)
+        del X_grid, Y_grid, out
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def accumulate_parallel(X_grid, Y_grid, positions, phase_shifts, wave_number, out, backend, workers, tile_budget,
+                        kernel_backend=None):
+    # kernel_backend picks the field_kernels kernel each band runs, backend the pool the bands run on
+    bands = row_bands(out.shape[0], workers)
+    band_budget = max(1, tile_budget // len(bands))  # The tile budget is shared by the bands running at once
+    pool = get_pool(backend, workers)
+
+    if backend == "threads":
+        # NumPy releases the GIL inside the ufuncs, so bands of one shared output run concurrently
+        futures = [pool.submit(accumulate_wave, X_grid[start:stop], Y_grid[start:stop], positions, phase_shifts,
+                               wave_number, out[start:stop], band_budget, kernel_backend) for start, stop in bands]
+        for future in futures:
+            future.result()
+        return out
+
+    # Processes: grid and output live in shared memory, workers write their bands in place, nothing is pickled back
+    blocks = []
+    try:
+        shared = []
+        for source in (X_grid, Y_grid, None):
+            block, array = shared_array(out.shape, out.dtype, source)
+            blocks.append(block)
+            shared.append(array)
+        names = [block.name for block in blocks]
+        futures = [pool.submit(accumulate_shared_band, names, out.shape, out.dtype, band, positions, phase_shifts,
+                               wave_number, band_budget, kernel_backend) for band in bands]
+        for future in futures:
+            future.result()
+        out[...] = shared[2]
+        del shared, array
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return out
+
+
+def accumulate_wave_points(X_points, Y_points, positions, phase_shifts, wave_number, out, backend="serial",
+                           workers=None, tile_budget=DEFAULT_TILE_BUDGET, kernel_backend=None):
+    # accumulate_wave over 1-D point sets (the exact region of a hybrid map) on a thread or process pool
+    if backend not in PARALLEL_BACKENDS:
+        logging.error(f"Unsupported parallel backend: {backend}")
+        raise ValueError(f"Parallel backend must be one of {PARALLEL_BACKENDS}.")
+    workers = workers or default_workers()
+    if backend == "serial" or workers == 1 or out.size * len(positions) < MIN_PARALLEL_WORK or out.size < 2:
+        accumulate_wave(X_points[None, :], Y_points[None, :], positions, phase_shifts, wave_number, out[None, :],
+                        tile_budget, kernel_backend)
+        return out
+
+    # One row per worker so accumulate_parallel can band them; the last row is padded with repeats of the last point
+    rows = min(workers, out.size)
+    cols = -(-out.size // rows)
+    padding = rows * cols - out.size
+    X_rows, Y_rows = (np.pad(points, (0, padding), mode='edge').reshape(rows, cols) for points in (X_points, Y_points))
+    folded = accumulate_parallel(X_rows, Y_rows, positions, phase_shifts, wave_number,
+                                 np.zeros((rows, cols), dtype=out.dtype), backend, workers, tile_budget, kernel_backend)
+    out += folded.reshape(-1)[:out.size]
+    return out
+
+
+def compute_wave_pattern_parallel(N, frequency, steering_angle, distance, grid, t=0, geometry="Linear", arc_radius=1.0,
+                                  tile_budget=DEFAULT_TILE_BUDGET, precision=None, backend="threads", workers=None,
+                                  context=DEFAULT_CONTEXT):
+    # compute_wave_pattern with the grid split into row bands over a thread or process pool
+    if backend not in PARALLEL_BACKENDS:
+        logging.error(f"Unsupported parallel backend: {backend}")
+        raise ValueError(f"Parallel backend must be one of {PARALLEL_BACKENDS}.")
+    workers = workers or default_workers()
+
+    if backend == "serial" or workers == 1 or grid[0].size * N < MIN_PARALLEL_WORK or grid[0].shape[0] < 2:
+        return compute_wave_pattern(N, frequency, steering_angle, distance, grid, t=t, geometry=geometry,
+                                    arc_radius=arc_radius, tile_budget=tile_budget, precision=precision,
+                                    context=context)
+
+    real_dtype, _ = context.dtypes(precision)
+    wavelength = context.wavelength(frequency)
+    positions, phase_shifts = compute_emitter_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+    positions = positions.astype(real_dtype)
+    phase_shifts = (2 * np.pi * frequency * t + phase_shifts).astype(real_dtype)
+    X_grid, Y_grid = (np.ascontiguousarray(axis, dtype=real_dtype) for axis in grid)
+
+    wave_pattern = np.zeros(X_grid.shape, dtype=real_dtype)
+    accumulate_parallel(X_grid, Y_grid, positions, phase_shifts, real_dtype.type(2 * np.pi / wavelength),
+                        wave_pattern, backend, workers, tile_budget, context.backend)
+    logging.debug(f"Transmitter Wave pattern computed on {workers} {backend} workers")
+    return wave_pattern, positions
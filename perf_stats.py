@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_WINDOW = 500  # Samples kept per stage for the rolling histogram
+HISTOGRAM_EDGES_MS = np.logspace(-2, 4, 25)  # 10 µs .. 10 s, log-spaced
+
+
+class LatencyRecorder:
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.samples = {}  # stage -> deque of (milliseconds, tags), newest last
+        self.lock = threading.Lock()  # The simulation and viewport workers record while the GUI thread reads
+
+    @contextmanager
+    def span(self, stage, **tags):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, **tags)
+
+    def record(self, stage, seconds, **tags):
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append((seconds * 1e3, tags))
+
+    def snapshot(self):
+        # Copy of the samples taken under the lock, safe to iterate while other threads keep recording
+        with self.lock:
+            return {stage: list(samples) for stage, samples in self.samples.items()}
+
+    def durations(self, stage, snapshot=None):
+        samples = self.snapshot() if snapshot is None else snapshot
+        return np.array([milliseconds for milliseconds, _ in samples.get(stage, ())])
+
+    def summary(self, snapshot=None):
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        summary = {}
+        for stage in snapshot:
+            durations = self.durations(stage, snapshot)
+            p50, p95 = np.percentile(durations, [50, 95])
+            summary[stage] = {'count': len(durations), 'p50_ms': float(p50), 'p95_ms': float(p95),
+                              'max_ms': float(np.max(durations))}
+        return summary
+
+    def histogram(self, stage, snapshot=None):
+        counts, _ = np.histogram(self.durations(stage, snapshot), bins=HISTOGRAM_EDGES_MS)
+        return counts
+
+    def hud_lines(self):
+        return [f"{stage:<22} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms"
+                for stage, stats in self.summary().items()]
+
+    def dump_json(self, path):
+        snapshot = self.snapshot()
+        report = {
+            'window': self.window,
+            'histogram_edges_ms': HISTOGRAM_EDGES_MS.tolist(),
+            'stages': {
+                stage: dict(stats, histogram=self.histogram(stage, snapshot).tolist(),
+                            samples=[{'ms': milliseconds, **tags} for milliseconds, tags in snapshot[stage]])
+                for stage, stats in self.summary(snapshot).items()
+            }
+        }
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2, default=str)
+        logging.info(f"Latency histograms written to {path}")
+        return path
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+
+recorder = LatencyRecorder()  # Shared by BeamForming and the main window
@@ -1,8 +1,13 @@
 import numpy as np
 import logging
+from dataclasses import dataclass, replace
 
 from scipy.constants import speed_of_light
 
+from field_kernels import accumulate_wave, accumulate_wave_tiles, compute_tile_shape, resolve_kernel_backend, \
+    resolve_precision, DEFAULT_TILE_BUDGET, TILE_TEMPORARIES, REFERENCE_BACKEND, PRECISIONS, DEFAULT_PRECISION
+from element_array import array_from_layout, DEFAULT_NUM_ANGLES
+
 logging.basicConfig(
     filename="Logging.log",
     level=logging.INFO,
@@ -16,26 +21,47 @@ five_g_reciever_frequency=5000000000
 GRID_FACTOR=100
 speed_of_receiver=3e8
 
-current_speed = SPEED_OF_SOUND_AIR  # Default speed of sound
-reciever_frequency=five_g_reciever_frequency
 max_size = 100  # Maximum grid size
-dx = None  # Grid spacing
 size=2
-
-def set_speed(speed):
-    global current_speed
-    current_speed = speed
-    logging.info(f"Speed updated to: {current_speed}")
-
-def set_frequency(frequency):
-    global reciever_frequency
-    reciever_frequency = frequency
-    logging.debug(f"Frequency updated to: {reciever_frequency}")
-
-def initialize_simulation_grid(N, frequency, distance,sizeX=5,sizeY=100, max_size=100,max_points=1000,geometry="linear"):
-    global dx
-    wavelength =  current_speed / frequency  # Wavelength
-    dx = wavelength / 10  # Grid spacing
+FFT_OVERSAMPLE = 64  # FFT bins per element in compute_beam_profile_fft, keeps interpolation error below ~0.01 dB
+APODIZATION_WINDOWS = {'rect': np.ones, 'hann': np.hanning, 'hamming': np.hamming, 'blackman': np.blackman,
+                       'bartlett': np.bartlett}
+
+@dataclass(frozen=True)
+class SimulationContext:
+    # Medium and numerics every compute function works in. Immutable and passed explicitly, so simulations of
+    # different media can run side by side in threads of one process; derive variants with replace().
+    speed: float = SPEED_OF_SOUND_AIR  # Propagation speed (m/s)
+    grid_spacing: float = None  # Grid step dx (m); None: λ/10, bounded by the max_points resolution cap
+    precision: str = DEFAULT_PRECISION  # "float64" or "float32"
+    backend: str = None  # field_kernels backend; None: the configured default
+
+    def __post_init__(self):
+        if not self.speed > 0:
+            logging.error(f"Invalid propagation speed: {self.speed}")
+            raise ValueError("Propagation speed must be positive.")
+        resolve_precision(self.precision)
+        object.__setattr__(self, 'precision', np.dtype(self.precision).name)
+        object.__setattr__(self, 'backend', resolve_kernel_backend(self.backend))
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+    def wavelength(self, frequency):
+        return self.speed / frequency  # λ = c / f
+
+    def dtypes(self, precision=None):
+        # Real and complex dtypes, an explicit precision argument overrides the context
+        return resolve_precision(self.precision if precision is None else precision)
+
+DEFAULT_CONTEXT = SimulationContext()
+
+def compute_grid_axes(frequency, sizeX=5, sizeY=100, max_size=100, max_points=1000, geometry="linear", precision=None,
+                      context=DEFAULT_CONTEXT):
+    # X and Y axis vectors of the simulation grid; the meshgrid is their outer product
+    real_dtype, _ = context.dtypes(precision)
+    wavelength =  context.wavelength(frequency)  # Wavelength
+    dx = wavelength / 10 if context.grid_spacing is None else context.grid_spacing  # Grid spacing
     max_dx = max(sizeX, sizeY) / max_points  # Upper bound for dx
     dx = max(dx, max_dx)  # Ensure dx is not too small
     logging.info(f"Calculated wavelength: {wavelength:.6f}, dx: {dx:.6f}")
@@ -53,53 +79,98 @@ def initialize_simulation_grid(N, frequency, distance,sizeX=5,sizeY=100, max_siz
     if X_grid.size == 0 or Y_grid.size == 0:
         logging.error("Grid size is invalid. Check dx and input parameters.")
         raise ValueError("Invalid grid size: dx is too large or frequency too small.")
-    logging.info(f"Grid initialized with size: {size}, wavelength: {wavelength}, dx: {dx}")
+
+    return (X_grid.astype(real_dtype), Y_grid.astype(real_dtype)), wavelength
+
+def initialize_simulation_grid(N, frequency, distance,sizeX=5,sizeY=100, max_size=100,max_points=1000,geometry="linear",
+                               precision=None, context=DEFAULT_CONTEXT, memory_budget=None, latency_target=None,
+                               mode="Emitter", tile_budget=DEFAULT_TILE_BUDGET):
+    if memory_budget is not None or latency_target is not None:
+        # Budgeted grid: grid_planner picks the finest dx (and precision) that fits, or refuses with ValueError
+        from grid_planner import plan_grid  # grid_planner builds on this module
+        plan = plan_grid(frequency, N or 1, sizeX=sizeX, sizeY=sizeY, max_size=max_size, max_points=max_points,
+                         geometry=geometry, mode=mode, memory_budget=memory_budget, latency_target=latency_target,
+                         tile_budget=tile_budget, precision=precision, context=context)
+        context = context.replace(grid_spacing=plan['dx'])
+        precision = plan['precision']
+
+    (X_grid, Y_grid), wavelength = compute_grid_axes(frequency, sizeX=sizeX, sizeY=sizeY, max_size=max_size,
+                                                     max_points=max_points, geometry=geometry, precision=precision,
+                                                     context=context)
+    logging.info(f"Grid initialized with size: {size}, wavelength: {wavelength}, dx: {X_grid[1] - X_grid[0]}")
 
     return np.meshgrid(X_grid, Y_grid), wavelength
 
-def compute_wave_pattern(N, frequency, steering_angle, distance, grid, t=0, geometry="Linear", arc_radius=1.0):
-    wavelength =  current_speed / frequency  # Wavelength
-    print(current_speed)
+def stride_grid(grid, stride):
+    # Every stride-th grid line, always keeping the last one so the preview covers the same extent
+    if stride <= 1:
+        return grid
+    X_grid, Y_grid = grid
+    rows = np.unique(np.r_[0:X_grid.shape[0]:stride, X_grid.shape[0] - 1])
+    cols = np.unique(np.r_[0:X_grid.shape[1]:stride, X_grid.shape[1] - 1])
+    return X_grid[np.ix_(rows, cols)], Y_grid[np.ix_(rows, cols)]
+
+def compute_preview_stride(grid, emitters, seconds_per_point, target_latency):
+    # Smallest power-of-two stride whose (pixels / stride²) × emitters evaluation fits in the target latency.
+    # Powers of two keep the set of preview grids small, so per-grid caches keep hitting while dragging.
+    points = grid[0].size * max(emitters, 1)
+    stride = np.sqrt(points * seconds_per_point / target_latency)
+    return 1 if stride <= 1 else int(2 ** np.ceil(np.log2(stride)))
+
+def compute_emitter_layout(N, wavelength, steering_angle, distance, geometry="Linear", arc_radius=1.0):
+    # Positions and steering phase shifts of the element_array preset for geometry
+    array = array_from_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+    return array.positions, np.angle(array.weights)
+
+def compute_wave_pattern(N, frequency, steering_angle, distance, grid, t=0, geometry="Linear", arc_radius=1.0,
+                         tile_budget=None, precision=None, array=None, backend=None, context=DEFAULT_CONTEXT):
+    real_dtype, _ = context.dtypes(precision)
+    wavelength =  context.wavelength(frequency)  # Wavelength
+
+    if array is not None:
+        # General element array (element_array.ElementArray): blocked steering-matrix products
+        wave_pattern = array.wave_pattern(grid, wavelength, omega_t=2 * np.pi * frequency * t,
+                                          tile_budget=tile_budget or DEFAULT_TILE_BUDGET)
+        return wave_pattern, array.positions
 
     wave_number = 2 * np.pi / wavelength  # Wave number k = 2π / wavelength
     omega = 2 * np.pi * frequency  # Angular frequency
-    steering_angle_rad = np.radians(steering_angle)  # Steering angle in radians
-    
+
     # logging.info(f"wave pattern: N={N}, frequency={frequency}, steering_angle={steering_angle}")
-    
-    
-    if geometry == "Curved":
-        # Positions along a circular arc
-        angles = np.linspace(-np.pi / 4, np.pi / 4, N)
-        positions = arc_radius * np.stack((np.sin(angles), np.cos(angles)), axis=1) #Convert polar to cartesian coordinates
-        phase_shifts = wave_number * arc_radius * np.sin(np.linspace(-np.pi / 4, np.pi / 4, N)) * np.sin(steering_angle_rad) #ϕ = k⋅R⋅sin(θs)⋅sin(θn)
-    
-    else:
-        positions = np.linspace(-(N - 1) * distance / 2, (N - 1) * distance / 2, N)
-        positions = np.column_stack((positions, np.zeros_like(positions)))  
 
-        # Phase shift per emitter due to steering
-        phase_shifts_per_distance = 2 * np.pi * distance * np.sin(steering_angle_rad) / wavelength # Δϕ = 2πdsin(θ)/λ , (Δx=d sin(θ): distance between adjacent emitters)
-        phase_shifts = np.arange(-(N - 1) / 2, (N - 1) / 2 + 1) * phase_shifts_per_distance
+    positions, phase_shifts = compute_emitter_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+    positions = positions.astype(real_dtype)
+    phase_shifts = (omega * t + phase_shifts).astype(real_dtype)
+
+    X_grid, Y_grid = grid[0].astype(real_dtype, copy=False), grid[1].astype(real_dtype, copy=False)
+    backend = context.backend if backend is None else resolve_kernel_backend(backend)
+    if tile_budget is not None or backend != REFERENCE_BACKEND:
+        # Kernel mode (field_kernels): tiled NumPy ufuncs, or a fused backend, accumulated into one output buffer
+        wave_pattern = np.zeros(X_grid.shape, dtype=real_dtype)
+        accumulate_wave(X_grid, Y_grid, positions, phase_shifts, wave_number, wave_pattern,
+                        tile_budget or DEFAULT_TILE_BUDGET, backend)
+        logging.debug(f"Transmitter Wave pattern computed by the {backend} kernel")
+        return wave_pattern, positions
 
-    X_grid, Y_grid = grid
     emitter_distances = np.sqrt((X_grid[:, :, None] - positions[:, 0]) ** 2 + (Y_grid[:, :, None] - positions[:, 1]) ** 2)
 
     # wave equation = Acos(kx−ωt+ϕ)
-    phase_shifts = wave_number * emitter_distances + omega * t + phase_shifts[None, None, :] # distances from each grid point to all emitter positions
+    phase_shifts = wave_number * emitter_distances + phase_shifts[None, None, :] # distances from each grid point to all emitter positions
     wave_pattern = np.sum(np.cos(phase_shifts), axis=2)
-    
+
     logging.debug(f"Transmitter Wave pattern computed")
-    
+
     return wave_pattern, positions
 
-def compute_receiver_pattern(grid, receiver_positions, frequency,steering_angle=0, current_speed=343, t=0):
-    X_grid, Y_grid = grid
-    interference_pattern = np.zeros(X_grid.shape)
+def compute_receiver_pattern(grid, receiver_positions, frequency,steering_angle=0, t=0, precision=None,
+                             context=DEFAULT_CONTEXT):
+    real_dtype, _ = context.dtypes(precision)
+    X_grid, Y_grid = grid[0].astype(real_dtype, copy=False), grid[1].astype(real_dtype, copy=False)
+    interference_pattern = np.zeros(X_grid.shape, dtype=real_dtype)
     
-    transmitter_position = np.array([20, 20])
+    transmitter_position = np.array([20, 20], dtype=real_dtype)
     
-    wavelength = current_speed / frequency 
+    wavelength = context.wavelength(frequency)
     wave_number = 2 * np.pi / wavelength  # k = 2π / wavelength
     omega = 2 * np.pi * frequency  # Angular frequency (ω = 2π * frequency)    
     emitter_distances = np.sqrt((X_grid - transmitter_position[0]) ** 2 + (Y_grid - transmitter_position[1]) ** 2)
@@ -113,21 +184,35 @@ def compute_receiver_pattern(grid, receiver_positions, frequency,steering_angle=
 
 
 def compute_beam_profile(Elements_Number, frequency, distance, direction_angle, receiver_positions, geometry="Linear",
-                         arc_radius=1.0, mode="Emitter"):
-    # Calculate wavelength: λ = c / f
-    Wavelength = current_speed / frequency  # Wavelength
-
-    # Calculate wave number: k = 2π / λ
-    k = 2 * np.pi / Wavelength  # Wave number
+                         arc_radius=1.0, mode="Emitter", num_angles=DEFAULT_NUM_ANGLES, precision=None,
+                         method="direct", array=None, context=DEFAULT_CONTEXT):
+    if array is not None and mode == "Emitter":
+        # General element array (element_array.ElementArray): far-field steering-matrix product
+        return array.beam_profile(context.wavelength(frequency), num_angles=num_angles)
+
+    if method == "fft":
+        if mode != "Emitter" or geometry != "Linear":
+            logging.error(f"FFT beam profile requested for {mode} mode with {geometry} geometry")
+            raise ValueError("The FFT method only applies to uniform linear emitter arrays.")
+        return compute_beam_profile_fft(Elements_Number, frequency, distance, direction_angle, num_angles=num_angles,
+                                        precision=precision, context=context)
+
+    real_dtype, _ = context.dtypes(precision)
+
+    if mode != "Receiver":
+        # Linear and Curved emitters: the element_array preset compute_wave_pattern draws, in the far field
+        wavelength = context.wavelength(frequency)
+        array = array_from_layout(Elements_Number, wavelength, direction_angle, distance, geometry, arc_radius,
+                                  precision=real_dtype)
+        angles, beam_profile = array.beam_profile(wavelength, num_angles=num_angles)
+        logging.info(f"Beam profile is computed")
+        return angles, beam_profile
 
     # Generate an array of observation angles from -90° to 90°
-    angles = np.linspace(-90, 90, 500)  # Array of angles in degrees
+    angles = np.linspace(-90, 90, num_angles, dtype=real_dtype)  # Array of angles in degrees
 
     # Convert the steering angle from degrees to radians
-    direction_rad = np.radians(direction_angle)  # Convert steering angle to radians
-
-    # Initialize array factor as a complex number array
-    array_factor = np.zeros_like(angles, dtype=np.complex128)
+    direction_rad = real_dtype.type(np.radians(direction_angle))  # Convert steering angle to radians
 
     # if mode == "Receiver":
     #     # angles = np.linspace(-90, 90, 500)
@@ -144,106 +229,29 @@ def compute_beam_profile(Elements_Number, frequency, distance, direction_angle,
     #
     #         # Accumulate contributions to the array factor
     #         array_factor += np.exp(1j * phase_shift)
-    if mode == "Receiver":
-
-        # angles = np.linspace(-30, 30, 500)
-
-        # Scale frequency to GHz and calculate wavelength
-        new_frequency = frequency * 1e7
-        wavelength = speed_of_light / new_frequency
-        k_new = 2 * np.pi / wavelength
-        print(receiver_positions)# Wave number
-        Elements_Number = len(receiver_positions)
-
-        window = np.blackman(Elements_Number)  # Blackman-Harris window
-        window /= np.sum(window)  # Normalize the window to ensure correct scaling
-
-        # window = np.kaiser(Elements_Number, beta=8.0)
-        # window /= np.sum(window)
-
-        # Ensure receiver positions are valid
-        if len(receiver_positions) != Elements_Number:
-            print("Error: Number of receiver positions does not match Elements_Number.")
-            return
-
-        # Calculate the phase shift for each receiver element
-        for n, pos in enumerate(receiver_positions):
-            if len(pos) != 2:  # Ensure each position has two coordinates [x, y]
-                print(f"Invalid position data at index {n}: {pos}")
-                continue
-
-            # Calculate the phase shift for this element (relative position along X-axis)
-            # The phase shift is affected by the relative position of the receiver and steering angle
-            phase_shift = k_new * pos[0] * np.sin(
-                direction_rad)  # Position along X-axis (relative to steering direction)
-
-            phase_shift *= window[n]  # Apply window to modify the phase shift
-
-            # Calculate gain for each element using the window value (tapered gain)
-            gain_n = window[n]  # Use the window values as gain
-
-            # Now we accumulate contributions to the array factor for all observation angles.
-            for i, angle in enumerate(angles):
-                # Calculate the phase shift for each observation angle based on the receiver position
-                phase_shift_angle = k_new * pos[0] * np.sin(np.radians(angle) - direction_rad)
-
-                # Calculate the complex weight for each element at each angle
-                complex_weight = gain_n * np.exp(1j * (phase_shift + phase_shift_angle))
-
-                # Accumulate the complex weight for each observation angle
-                array_factor[i] += complex_weight  # Sum contributions from all elements
-
-        # Apply tapering window for side lobe reduction
-        # window = np.blackman(len(receiver_positions))
-        # window /= np.sum(window)
-        # # window /= np.sum(window)
-        #
-        # # Calculate weights for steering to the desired direction
-        # receiver_weights = np.exp(-1j * k_new * distance * np.sin(direction_rad) * np.arange(len(receiver_positions)))
-        # receiver_weights *= window  # Apply windowing
-        #
-        # # Iterate over receiver positions and apply weights
-        # for n, pos in enumerate(receiver_positions):
-        #     # Distance between receiver and observation point
-        #     distance_to_point = np.hypot(pos[0] - distance * np.sin(direction_rad),
-        #                                  pos[1] - distance * np.cos(direction_rad))
-        #
-        #     # Phase shift calculation: φ = kr + k(x·sin(θ) - y·cos(θ))
-        #     phase_shift = k_new * distance_to_point + k_new * (
-        #             pos[0] * np.sin(np.radians(angles)) - pos[1] * np.cos(np.radians(angles))
-        #     )
-        #
-        #     # Apply the weight to the array factor for the nth receiver
-        #     array_factor += receiver_weights[n] * np.exp(1j * phase_shift)
 
-    else:
-        if geometry == "Curved":
-            # Curved geometry: emitter positions on a circular arc
-            # Generate emitter angles evenly spaced along the arc
-            emit_angles = np.linspace(-np.pi / 4, np.pi / 4, Elements_Number)  # Adjust based on arc_radius
-
-            # Emitter positions: [x, y] = R[cos(θ), sin(θ)]
-            positions = arc_radius * np.array([np.cos(emit_angles), np.sin(emit_angles)]).T
-
-            for pos in positions:
-                # Distance between emitter and observation point: r = √((x - d·sin(θ))² + (y - d·cos(θ))²)
-                distance_to_point = np.hypot(pos[0] - distance * np.sin(direction_rad),
-                                             pos[1] - distance * np.cos(direction_rad))
-
-                # Phase shift calculation: φ = kr + k(x·sin(θ) - y·cos(θ))
-                phase_shift = k * distance_to_point + k * (
-                        pos[0] * np.sin(np.radians(angles)) - pos[1] * np.cos(np.radians(angles)))
-
-                # Accumulate contributions to the array factor
-                array_factor += np.exp(1j * phase_shift)
-        else:
-            # Linear geometry: emitters spaced along X-axis
-            for n in range(Elements_Number):
-                # Phase shift for linear array: φ = kd·sin(θ)·n
-                phase_shift = k * distance * np.sin(np.radians(angles - direction_angle)) * n
-
-                # Accumulate contributions to the array factor
-                array_factor += np.exp(1j * phase_shift)
+    # Receiver mode: scale frequency to GHz and calculate wavelength
+    new_frequency = frequency * 1e7
+    wavelength = speed_of_light / new_frequency
+    k_new = 2 * np.pi / wavelength  # Wave number
+
+    receiver_positions = np.asarray(receiver_positions, dtype=real_dtype)
+    if receiver_positions.ndim != 2 or receiver_positions.shape[1] != 2:
+        logging.error(f"Invalid receiver positions with shape {receiver_positions.shape}, expected (N, 2)")
+        raise ValueError("Receiver positions must be an (N, 2) array of [x, y] coordinates.")
+
+    window = np.blackman(len(receiver_positions)).astype(real_dtype)  # Blackman-Harris window
+    window /= np.sum(window)  # Normalize the window to ensure correct scaling
+
+    # Phase shift per element from its position along X relative to the steering direction, tapered by the window
+    x_positions = receiver_positions[:, 0]
+    steering_phase = k_new * x_positions * np.sin(direction_rad) * window
+
+    # Element × angle phase: φ(n, θ) = k·xn·sin(θ - θs)
+    angle_phase = k_new * x_positions[:, None] * np.sin(np.radians(angles)[None, :] - direction_rad)
+
+    # Window values are the element gains: AF(θ) = Σ wn·exp(i(φn + φ(n, θ)))
+    array_factor = window @ np.exp(1j * (steering_phase[:, None] + angle_phase))
 
     # Magnitude of the array factor |AF(θ)|
     array_factor = np.abs(array_factor)
@@ -261,5 +269,84 @@ def compute_beam_profile(Elements_Number, frequency, distance, direction_angle,
     return angles, 20 * np.log10(array_factor)  # Convert to dB scale
 
 
+def apodization_weights(Elements_Number, window=None):
+    # Element gains from a window name in APODIZATION_WINDOWS, an explicit weight array, or None (uniform)
+    if window is None:
+        window = 'rect'
+    if isinstance(window, str):
+        if window not in APODIZATION_WINDOWS:
+            logging.error(f"Unknown apodization window: {window}")
+            raise ValueError(f"Window must be one of {tuple(APODIZATION_WINDOWS)} or an array of element weights.")
+        return APODIZATION_WINDOWS[window](Elements_Number)
+    weights = np.asarray(window, dtype=float)
+    if weights.shape != (Elements_Number,):
+        logging.error(f"Apodization weights with shape {weights.shape} for {Elements_Number} elements")
+        raise ValueError("Apodization weights must hold one value per element.")
+    return weights
+
+
+def compute_beam_profile_fft(Elements_Number, frequency, distance, direction_angle, num_angles=DEFAULT_NUM_ANGLES,
+                             angles=None, window=None, fft_size=None, precision=None, context=DEFAULT_CONTEXT):
+    # Uniform linear array: AF(ψ) = Σ wn·exp(i·n·ψ) with ψ = kd·(sin(θ) - sin(θs)) is a DFT of the element weights.
+    # One zero-padded FFT samples AF on a uniform ψ grid, which is then resampled onto the requested angles.
+    real_dtype, complex_dtype = context.dtypes(precision)
+    weights = apodization_weights(Elements_Number, window)
+
+    if angles is None:
+        angles = np.linspace(-90, 90, num_angles, dtype=real_dtype)  # Observation angles in degrees
+    angles = np.asarray(angles, dtype=real_dtype)
+
+    # Zero padding to a power of two of at least FFT_OVERSAMPLE bins per element
+    if fft_size is None:
+        fft_size = 1 << int(np.ceil(np.log2(FFT_OVERSAMPLE * Elements_Number)))
+    if fft_size < Elements_Number:
+        logging.error(f"FFT size {fft_size} is smaller than the {Elements_Number} elements")
+        raise ValueError("fft_size must be at least the number of elements.")
+
+    # ifft computes (1/M)·Σ wn·exp(+2πi·n·m/M), i.e. AF at ψm = 2π·m/M up to the 1/M factor
+    spectrum = (fft_size * np.fft.ifft(weights, n=fft_size)).astype(complex_dtype)
+
+    # Non-uniform resampling: ψ wrapped onto [0, 2π), linear interpolation between neighbouring bins (periodic)
+    k = 2 * np.pi / context.wavelength(frequency)  # Wave number: k = 2π·f / c
+    psi = k * distance * (np.sin(np.radians(angles.astype(float))) - np.sin(np.radians(direction_angle)))
+    position = np.mod(psi, 2 * np.pi) * (fft_size / (2 * np.pi))
+    lower = np.floor(position).astype(np.intp)
+    fraction = (position - lower).astype(real_dtype)
+    lower %= fft_size
+    array_factor = spectrum[lower] * (1 - fraction) + spectrum[(lower + 1) % fft_size] * fraction
+
+    # Magnitude, normalisation, clipping and dB conversion as in compute_beam_profile
+    array_factor = np.abs(array_factor)
+    array_factor /= np.max(array_factor)
+    array_factor = np.clip(array_factor, 1e-10, 1)
+
+    logging.info(f"Beam profile computed by FFT ({fft_size} bins, {len(angles)} angles)")
+
+    return angles, 20 * np.log10(array_factor)
+
+
+
+
+def compute_beam_map(Elements_Number, frequencies, distance, direction_angles, geometry="Linear", arc_radius=1.0,
+                     num_angles=DEFAULT_NUM_ANGLES, precision=None, context=DEFAULT_CONTEXT):
+    # Batched emitter beam profiles over a steering × frequency sweep, as a (n_freq, n_steer, n_angle) dB tensor
+    real_dtype, _ = context.dtypes(precision)
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    direction_angles = np.atleast_1d(np.asarray(direction_angles, dtype=float))
+
+    # One element_array preset per frequency with a weight column per steering angle, so the whole sweep is a
+    # (angle × element) @ (element × steer) product per frequency
+    angles = np.linspace(-90, 90, num_angles, dtype=real_dtype)  # Observation angles in degrees
+    array_factor = np.empty((len(frequencies), len(direction_angles), num_angles), dtype=real_dtype)
+    for i, wavelength in enumerate(context.wavelength(frequencies)):
+        array = array_from_layout(Elements_Number, wavelength, direction_angles, distance, geometry, arc_radius,
+                                  precision=real_dtype)
+        array_factor[i] = np.abs(array.far_field(angles, wavelength)).T
+
+    # Normalize every profile by its own peak, clip and convert to dB as compute_beam_profile does
+    array_factor /= np.max(array_factor, axis=-1, keepdims=True)
+    array_factor = np.clip(array_factor, 1e-10, 1)
 
+    logging.info(f"Beam map computed for {len(frequencies)} frequencies x {len(direction_angles)} steering angles")
 
+    return angles, 20 * np.log10(array_factor)
@@ -0,0 +1,77 @@
+import logging
+
+import numpy as np
+
+from bounded_lru import BoundedLRU
+from phased_array import compute_emitter_layout, compute_wave_pattern, DEFAULT_CONTEXT
+
+DEFAULT_PHASOR_CACHE_BYTES = 256 * 1024 * 1024  # Memory cap for cached per-emitter fields
+EMITTER_BLOCK = 16  # Emitter fields gathered per matrix-vector product
+
+
+def field_dtype(grid):
+    # complex64 phasors for a float32 grid, complex128 otherwise
+    return np.result_type(grid[0].dtype, np.complex64)
+
+
+def grid_key(grid):
+    # Identify a meshgrid by its shape, precision and corner coordinates, not by object identity
+    X_grid, Y_grid = grid
+    return (X_grid.shape, X_grid.dtype.str, float(X_grid[0, 0]), float(X_grid[-1, -1]), float(Y_grid[0, 0]), float(Y_grid[-1, -1]))
+
+
+class PhasorCache:
+    def __init__(self, max_bytes=DEFAULT_PHASOR_CACHE_BYTES):
+        self.fields = BoundedLRU(max_bytes, name="Phasor cache")
+
+    def field_bytes(self, grid, emitters):
+        return grid[0].size * emitters * field_dtype(grid).itemsize
+
+    def emitter_field(self, grid, key, wavelength, position):
+        # exp(i·k·r) for one emitter over the flattened grid, cached per absolute emitter position.
+        # Steering and phase changes reuse every field. The Linear layout is centred, so changing N by one moves
+        # every element by d/2 and recomputes all fields; changing it by two keeps the old positions and only
+        # computes the two new end elements.
+        field_key = (key, wavelength, round(float(position[0]), 12), round(float(position[1]), 12))
+        field = self.fields.get(field_key)
+        if field is None:
+            X_grid, Y_grid = grid
+            wave_number = X_grid.dtype.type(2 * np.pi / wavelength)
+            distances = np.hypot(X_grid - X_grid.dtype.type(position[0]), Y_grid - Y_grid.dtype.type(position[1]))
+            field = np.exp(1j * wave_number * distances).ravel()
+            field.flags.writeable = False
+            self.fields.put(field_key, field)
+        return field
+
+    def complex_field(self, grid, positions, phase_shifts, wavelength, omega_t=0.0):
+        # Σ exp(i·k·rn) · exp(i(ϕn + ωt)): a weighted reduction over the cached emitter fields
+        key = grid_key(grid)
+        dtype = field_dtype(grid)
+        weights = np.exp(1j * (np.asarray(phase_shifts) + omega_t)).astype(dtype)
+        field = np.zeros(grid[0].size, dtype=dtype)
+
+        for e0 in range(0, len(positions), EMITTER_BLOCK):
+            block = np.stack([self.emitter_field(grid, key, wavelength, position)
+                              for position in positions[e0:e0 + EMITTER_BLOCK]])
+            field += weights[e0:e0 + EMITTER_BLOCK] @ block
+
+        return field.reshape(grid[0].shape)
+
+    def wave_pattern(self, grid, positions, phase_shifts, wavelength, omega_t=0.0):
+        # Σ cos(k·rn + ϕn + ωt) = Re(Σ exp(i·k·rn) · exp(i(ϕn + ωt)))
+        return self.complex_field(grid, positions, phase_shifts, wavelength, omega_t).real
+
+def compute_wave_pattern_cached(cache, N, frequency, steering_angle, distance, grid, t=0, geometry="Linear",
+                                arc_radius=1.0, tile_budget=None, context=DEFAULT_CONTEXT):
+    # Drop-in replacement for compute_wave_pattern that reuses per-emitter phasors across steering changes
+    if not cache.fields.fits(cache.field_bytes(grid, N)):
+        logging.debug("Phasor cache too small for this grid, computing the wave pattern directly")
+        return compute_wave_pattern(N, frequency, steering_angle, distance, grid, t=t, geometry=geometry,
+                                    arc_radius=arc_radius, tile_budget=tile_budget, precision=grid[0].dtype,
+                                    context=context)
+
+    wavelength = context.wavelength(frequency)
+    positions, phase_shifts = compute_emitter_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+    wave_pattern = cache.wave_pattern(grid, positions, phase_shifts, wavelength, omega_t=2 * np.pi * frequency * t)
+    logging.debug(f"Transmitter Wave pattern computed from phasor cache: {cache.fields.stats()}")
+    return wave_pattern, positions
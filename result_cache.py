@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from bounded_lru import BoundedLRU
+from phasor_cache import grid_key
+
+DEFAULT_RESULT_CACHE_BYTES = 256 * 1024 * 1024  # Memory cap for cached results
+DEFAULT_DISK_CACHE_BYTES = 2 * 1024 * 1024 * 1024  # Disk cap for the memory-mapped tier
+RESULT_CACHE_DIR_ENV = "BEAMFORMING_RESULT_CACHE_DIR"  # Environment variable enabling the on-disk tier
+RESULT_FIELDS = ('wave_pattern', 'positions', 'angles', 'beam_profile')
+RESULT_FORMAT = 2  # Part of every key; bump when a compute change alters results, so old disk entries stop matching
+# Every state entry the map and profile depend on; render settings, tile budget and backends are left out
+RESULT_STATE_KEYS = ('mode', 'N', 'f', 'direction', 'distance', 'geometry', 'curvature', 'receiver_count',
+                     'receiver_spacing', 'far_field_distance', 'hybrid_target_error')
+
+
+def state_key(state):
+    # Hash of every input the map depends on apart from the grid
+    context = state['context']
+    inputs = (RESULT_FORMAT, tuple(state.get(name) for name in RESULT_STATE_KEYS),
+              (context.speed, context.grid_spacing, context.precision))
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()
+
+
+def result_key(state, grid):
+    # Content address of one result: hash of the inputs, so equal states on equal grids share an entry
+    return hashlib.sha256(repr((state_key(state), grid_key(grid))).encode()).hexdigest()
+
+
+def entry_bytes(path):
+    # Bytes of the .npy files of one on-disk entry
+    files = [os.path.join(path, field + '.npy') for field in RESULT_FIELDS]
+    return sum(os.path.getsize(file) for file in files if os.path.exists(file))
+
+
+class DiskTier:
+    # One directory per result holding a .npy file per field; entries are read back memory-mapped
+    def __init__(self, directory, max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.entries = OrderedDict()  # key -> bytes on disk, least recently used first
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Entries written by earlier sessions, oldest access first
+        existing = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not os.path.isdir(path):
+                continue
+            if '.tmp' in name:
+                shutil.rmtree(path, ignore_errors=True)  # Left behind by an interrupted write
+                continue
+            existing.append((os.path.getmtime(path), name, entry_bytes(path)))
+        for _, name, size in sorted(existing):
+            self.entries[name] = size
+        self.current_bytes = sum(self.entries.values())
+        self.evict()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        path = self.path(key)
+        try:
+            os.utime(path)  # Access time orders eviction across restarts
+            return {field: np.load(os.path.join(path, field + '.npy'), mmap_mode='r') for field in RESULT_FIELDS}
+        except (OSError, ValueError) as error:
+            logging.warning(f"Unreadable result cache entry {key[:12]}, dropping it: {error}")
+            self.remove(key)
+            return None
+
+    def put(self, key, value):
+        if sum(np.asarray(value[field]).nbytes for field in RESULT_FIELDS) > self.max_bytes:
+            return False
+        with self.lock:
+            if key in self.entries:
+                return True
+
+        # Write next to the final location and rename, so readers never see a partial entry
+        temporary = f"{self.path(key)}.tmp{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.makedirs(temporary)
+            for field in RESULT_FIELDS:
+                np.save(os.path.join(temporary, field + '.npy'), np.asarray(value[field]))
+            os.rename(temporary, self.path(key))
+        except OSError as error:
+            shutil.rmtree(temporary, ignore_errors=True)
+            if not os.path.isdir(self.path(key)):
+                logging.warning(f"Could not write result cache entry {key[:12]}: {error}")
+                return False
+
+        size = entry_bytes(self.path(key))
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = size
+                self.current_bytes += size
+            self.evict()
+        return True
+
+    def remove(self, key):
+        with self.lock:
+            self.current_bytes -= self.entries.pop(key, 0)
+        shutil.rmtree(self.path(key), ignore_errors=True)
+
+    def evict(self):
+        # Caller holds the lock (or is the constructor)
+        while self.current_bytes > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.current_bytes -= size
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            logging.debug(f"Result cache evicted {key[:12]} from disk")
+
+    def clear(self):
+        with self.lock:
+            keys = list(self.entries)
+            self.entries.clear()
+            self.current_bytes = 0
+        for key in keys:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+
+
+class ResultCache:
+    # (wave_pattern, positions, angles, beam_profile) per state: an in-memory LRU in front of an optional disk tier
+    def __init__(self, max_bytes=DEFAULT_RESULT_CACHE_BYTES, directory=None, max_disk_bytes=DEFAULT_DISK_CACHE_BYTES):
+        self.memory = BoundedLRU(max_bytes, name="Result cache")
+        directory = directory or os.environ.get(RESULT_CACHE_DIR_ENV)
+        self.disk = DiskTier(directory, max_disk_bytes) if directory else None
+        self.disk_hits = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            logging.info(f"Result cache hit (memory) for {key[:12]}")
+            return value
+        if self.disk is None:
+            return None
+
+        value = self.disk.get(key)
+        if value is not None:
+            self.disk_hits += 1
+            self.memory.put(key, value)
+            logging.info(f"Result cache hit (disk) for {key[:12]}")
+        return value
+
+    def put(self, key, results):
+        value = {field: results[field] for field in RESULT_FIELDS}
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = self.memory.stats()
+        if self.disk is not None:
+            stats.update(disk_entries=len(self.disk.entries), disk_bytes=self.disk.current_bytes,
+                         disk_hits=self.disk_hits)
+        return stats
@@ -0,0 +1,67 @@
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class SimulationWorker(QObject):
+    # Runs BeamForming.compute_results on a background thread with latest-wins semantics:
+    # - submit() only replaces the single pending slot, so queued slider events collapse into one job;
+    # - a job whose generation is no longer the latest is told to stop at its next stage boundary;
+    # - result_ready is emitted only for the latest generation, and the GUI re-checks that on delivery.
+    # Together this guarantees a stale result never overwrites a newer one.
+    result_ready = pyqtSignal(int, object)  # generation, results dict (passed by reference, never copied)
+
+    def __init__(self, compute, parent=None):
+        super().__init__(parent)
+        self.compute = compute
+        self.condition = threading.Condition()
+        self.pending = None  # (generation, state, grid)
+        self.latest_generation = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="simulation-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, state, grid):
+        with self.condition:
+            self.latest_generation += 1
+            self.pending = (self.latest_generation, dict(state), grid)
+            self.condition.notify()
+            return self.latest_generation
+
+    def supersede(self):
+        # Invalidate pending and in-flight jobs without queuing a new one (e.g. a preview was rendered instead)
+        with self.condition:
+            self.latest_generation += 1
+            self.pending = None
+
+    def is_latest(self, generation):
+        with self.condition:
+            return generation == self.latest_generation
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                generation, state, grid = self.pending
+                self.pending = None
+
+            try:
+                results = self.compute(state, grid, cancelled=lambda: not self.is_latest(generation))
+            except Exception:
+                logging.exception(f"Simulation job {generation} failed")
+                continue
+
+            if results is None or not self.is_latest(generation):
+                logging.debug(f"Simulation job {generation} superseded, result dropped")
+                continue
+            self.result_ready.emit(generation, results)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join(timeout=5)
@@ -0,0 +1,168 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from beam_metrics import beam_metrics
+from phased_array import initialize_simulation_grid, compute_wave_pattern, compute_beam_profile, SimulationContext, \
+    SPEED_OF_SOUND_AIR, DEFAULT_NUM_ANGLES, DEFAULT_TILE_BUDGET
+
+# Headless parameter sweep over the phased_array kernels: no Qt, no matplotlib.
+# Example: python sweep.py --N 4:65:4 --f 500,1000,2000 --direction=-60:61:5 --out sweeps/run1
+
+SWEEP_PARAMETERS = ('N', 'f', 'direction', 'distance', 'curvature', 'geometry')
+MANIFEST_NAME = "sweep.json"
+
+
+def parse_values(text, cast=float):
+    # "a,b,c" lists values, "start:stop:step" expands like np.arange
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        return [cast(value) for value in np.arange(start, stop, step)]
+    return [cast(value) for value in text.split(',')]
+
+
+def sweep_configurations(options):
+    # Cartesian product in a fixed order, so chunk i always holds the same configurations
+    return itertools.product(options['N'], options['f'], options['direction'], options['distance'],
+                             options['curvature'], options['geometry'])
+
+
+def sweep_size(options):
+    return int(np.prod([len(options[name]) for name in SWEEP_PARAMETERS]))
+
+
+def chunk_path(out_dir, chunk_index):
+    return os.path.join(out_dir, f"chunk_{chunk_index:06d}.npz")
+
+
+def initialize_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def run_chunk(chunk_index, configurations, options, out_dir):
+    count = len(configurations)
+    context = SimulationContext(speed=options['speed'])
+    angles = np.linspace(-90, 90, options['num_angles'])
+    profiles = np.empty((count, options['num_angles']), dtype=np.float32)
+    maps = {}
+    grids = {}
+
+    for i, (N, f, direction, distance, curvature, geometry) in enumerate(configurations):
+        angles, beam_profile = compute_beam_profile(N, f, distance, direction, None, geometry=geometry,
+                                                    arc_radius=curvature, num_angles=options['num_angles'],
+                                                    context=context)
+        profiles[i] = beam_profile
+
+        if options['maps']:
+            grid_key = (N, f, distance, geometry)
+            if grid_key not in grids:
+                grids.clear()
+                grids[grid_key], _ = initialize_simulation_grid(
+                    N, f, distance, sizeX=options['size_x'], sizeY=options['size_y'],
+                    max_points=options['max_points'], geometry=geometry, context=context)
+            wave_pattern, _ = compute_wave_pattern(N, f, direction, distance, grids[grid_key], geometry=geometry,
+                                                   arc_radius=curvature, tile_budget=DEFAULT_TILE_BUDGET,
+                                                   context=context)
+            maps[f"map_{i}"] = wave_pattern.astype(np.float32)
+
+    # Metrics for the whole chunk in one batched pass, measured the way the beam profile viewer marks them
+    metrics = beam_metrics(angles, profiles)
+    columns = list(zip(*configurations))
+    temporary_path = chunk_path(out_dir, chunk_index) + ".tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(file, N=np.array(columns[0]), f=np.array(columns[1]), direction=np.array(columns[2]),
+                 distance=np.array(columns[3]), curvature=np.array(columns[4]), geometry=np.array(columns[5]),
+                 angles=angles, beam_profile=profiles, main_lobe_angle=metrics['main_lobe_angle'],
+                 beamwidth_3db=metrics['beamwidth_3db'], peak_sidelobe_db=metrics['peak_sidelobe_db'],
+                 directivity_db=metrics['directivity_db'], first_null_left=metrics['first_null_left'],
+                 first_null_right=metrics['first_null_right'], **maps)
+    # Atomic rename: a chunk file either exists complete or not at all, which is what resume relies on
+    os.replace(temporary_path, chunk_path(out_dir, chunk_index))
+    return chunk_index, count
+
+
+def write_manifest(out_dir, options):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as file:
+            previous = json.load(file)
+        if previous != options:
+            raise ValueError(f"{out_dir} holds a different sweep; use a new --out directory to start over.")
+        return
+    with open(path, "w") as file:
+        json.dump(options, file, indent=2)
+
+
+def run_sweep(options, out_dir, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    write_manifest(out_dir, options)
+
+    workers = workers or os.cpu_count() or 1
+    total = sweep_size(options)
+    n_chunks = -(-total // options['chunk_size'])
+    configurations = sweep_configurations(options)
+
+    done = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker) as executor:
+        pending = set()
+        for chunk_index in range(n_chunks):
+            chunk = list(itertools.islice(configurations, options['chunk_size']))
+            if os.path.exists(chunk_path(out_dir, chunk_index)):
+                skipped += 1
+                continue
+
+            # Keep only a couple of chunks per worker in flight so memory stays bounded
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                done += sum(future.result()[1] for future in finished)
+                logging.info(f"Sweep progress: {done} configurations written")
+            pending.add(executor.submit(run_chunk, chunk_index, chunk, options, out_dir))
+
+        for future in pending:
+            done += future.result()[1]
+
+    logging.info(f"Sweep finished: {done} configurations computed, {skipped} chunks resumed from {out_dir}")
+    return done
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless beam-forming parameter sweep")
+    parser.add_argument("--N", default="2,4,8,16", help="Element counts, 'a,b,c' or 'start:stop:step'")
+    parser.add_argument("--f", default="500", help="Frequencies (Hz)")
+    parser.add_argument("--direction", default="0", help="Steering angles (°)")
+    parser.add_argument("--distance", default="0.1", help="Element spacing / focus distance (m)")
+    parser.add_argument("--curvature", default="1.0", help="Arc radius for the Curved geometry (m)")
+    parser.add_argument("--geometry", default="Linear", help="Linear, Curved or both")
+    parser.add_argument("--speed", type=float, default=SPEED_OF_SOUND_AIR, help="Propagation speed (m/s)")
+    parser.add_argument("--num-angles", type=int, default=DEFAULT_NUM_ANGLES, help="Observation angles per profile")
+    parser.add_argument("--maps", action="store_true", help="Also store the interference map of each configuration")
+    parser.add_argument("--size-x", type=float, default=5, help="Map half-width (m)")
+    parser.add_argument("--size-y", type=float, default=7, help="Map depth (m)")
+    parser.add_argument("--max-points", type=int, default=1000, help="Map resolution cap")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Configurations per .npz chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--out", required=True, help="Output directory; rerun with the same one to resume")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = {
+        'N': parse_values(args.N, int), 'f': parse_values(args.f), 'direction': parse_values(args.direction),
+        'distance': parse_values(args.distance), 'curvature': parse_values(args.curvature),
+        'geometry': args.geometry.split(','), 'speed': args.speed, 'num_angles': args.num_angles,
+        'maps': args.maps, 'size_x': args.size_x, 'size_y': args.size_y, 'max_points': args.max_points,
+        'chunk_size': args.chunk_size
+    }
+    print(f"Sweeping {sweep_size(options)} configurations into {args.out}")
+    run_sweep(options, args.out, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
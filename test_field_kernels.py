@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from field_kernels import KERNEL_BACKENDS, REFERENCE_BACKEND, CONFORMANCE_RTOL, DEFAULT_TILE_BUDGET
+
+KNOWN_BACKENDS = ("numpy", "numba")  # Optional backends are skipped when their dependency is missing
+SHAPE = (37, 53)
+SMALL_TILE_BUDGET = 4096  # Exercises the blocked paths as well
+
+
+@pytest.mark.parametrize("backend", sorted(set(KNOWN_BACKENDS) | set(KERNEL_BACKENDS)))
+@pytest.mark.parametrize("precision", ("float64", "float32"))
+@pytest.mark.parametrize("N", (1, 7, 64))
+def test_backend_matches_reference(backend, precision, N):
+    # Every registered backend against the NumPy reference on a random layout
+    if backend not in KERNEL_BACKENDS:
+        pytest.skip(f"Kernel backend '{backend}' is not available")
+    rng = np.random.default_rng(N)
+    dtype = np.dtype(precision)
+    X_grid, Y_grid = np.meshgrid(np.linspace(-5, 5, SHAPE[1], dtype=dtype), np.linspace(0, 7, SHAPE[0], dtype=dtype))
+    positions = rng.uniform(-1, 1, (N, 2)).astype(dtype)
+    phase_shifts = rng.uniform(-np.pi, np.pi, N).astype(dtype)
+    wave_number = dtype.type(rng.uniform(1, 60))
+
+    reference = KERNEL_BACKENDS[REFERENCE_BACKEND](X_grid, Y_grid, positions, phase_shifts, wave_number,
+                                                   np.zeros(SHAPE, dtype=dtype), DEFAULT_TILE_BUDGET)
+    result = KERNEL_BACKENDS[backend](X_grid, Y_grid, positions, phase_shifts, wave_number,
+                                      np.zeros(SHAPE, dtype=dtype), SMALL_TILE_BUDGET)
+
+    assert result.dtype == dtype
+    assert np.max(np.abs(result - reference)) / N <= CONFORMANCE_RTOL[precision]
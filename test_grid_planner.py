@@ -0,0 +1,46 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from grid_planner import plan_grid
+from phased_array import initialize_simulation_grid, SimulationContext
+from phasor_cache import PhasorCache, compute_wave_pattern_cached
+
+MEMORY_BUDGET = 64 * 1024 * 1024
+FREQUENCY = 2000
+SPACING = 0.1
+
+
+def traced_peak(compute):
+    tracemalloc.start()
+    try:
+        compute()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("precision", ("float64", "float32"))
+@pytest.mark.parametrize("N", (16, 40))
+def test_phasor_map_stays_within_budget(precision, N):
+    # The GUI's serial engine: the planned grid plus the phasor fields it caches must fit the budget
+    context = SimulationContext(precision=precision)
+    plan = plan_grid(FREQUENCY, N, sizeX=5, sizeY=7, max_points=1000, memory_budget=MEMORY_BUDGET, engine="phasor",
+                     allow_float32=False, seconds_per_point=1e-9, context=context)
+    assert plan['peak_bytes'] <= MEMORY_BUDGET
+
+    def compute():
+        grid, _ = initialize_simulation_grid(N, FREQUENCY, SPACING, sizeX=5, sizeY=7, max_points=1000,
+                                             context=context.replace(grid_spacing=plan['dx']))
+        compute_wave_pattern_cached(PhasorCache(), N, FREQUENCY, 10, SPACING, grid, context=context)
+
+    assert traced_peak(compute) <= MEMORY_BUDGET
+
+
+def test_phasor_estimate_exceeds_tiled_estimate():
+    tiled = plan_grid(FREQUENCY, 16, sizeX=5, sizeY=7, max_points=1000, memory_budget=None, seconds_per_point=1e-9)
+    phasor = plan_grid(FREQUENCY, 16, sizeX=5, sizeY=7, max_points=1000, memory_budget=None, engine="phasor",
+                       seconds_per_point=1e-9)
+    assert phasor['peak_bytes'] > tiled['peak_bytes']
+    assert np.isclose(phasor['dx'], tiled['dx'])
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from phased_array import compute_beam_profile
+
+ELEMENT_COUNTS = (4, 16, 64, 128)
+FREQUENCIES = (500, 2000, 8000)
+STEERING_ANGLES = (-60, 0, 30)
+SPACING = 0.1
+TOLERANCE_DB = 0.12  # float32 vs float64 profile difference, wherever the float64 profile is within RANGE_DB of the peak
+RANGE_DB = 40.0
+MAIN_LOBE_SAMPLES = 1  # Allowed main-lobe shift, in angle samples
+
+
+def main_lobe_index(profile, reference_peak):
+    # Peak of profile inside the reference's -3 dB lobe around reference_peak. With grating lobes several peaks
+    # reach 0 dB, so the global arg max may jump between them on rounding alone.
+    below = profile < -3
+    left = reference_peak - np.argmax(below[reference_peak::-1]) if below[:reference_peak].any() else 0
+    right = reference_peak + np.argmax(below[reference_peak:]) if below[reference_peak:].any() else len(profile)
+    return left + int(np.argmax(profile[left:right]))
+
+
+@pytest.mark.parametrize("geometry", ("Linear", "Curved", "Receiver"))
+@pytest.mark.parametrize("N", ELEMENT_COUNTS)
+@pytest.mark.parametrize("frequency", FREQUENCIES)
+@pytest.mark.parametrize("steering_angle", STEERING_ANGLES)
+def test_float32_beam_profile_matches_float64(geometry, N, frequency, steering_angle):
+    receivers = np.column_stack((SPACING * (np.arange(N) - (N - 1) / 2), np.zeros(N)))
+    mode = "Receiver" if geometry == "Receiver" else "Emitter"
+    (_, reference), (_, profile) = [
+        compute_beam_profile(N, frequency, SPACING, steering_angle, receivers,
+                             geometry="Curved" if geometry == "Curved" else "Linear", mode=mode, precision=precision)
+        for precision in ("float64", "float32")]
+    assert profile.dtype == np.float32
+
+    inside = reference >= -RANGE_DB
+    np.testing.assert_allclose(profile[inside], reference[inside], rtol=0, atol=TOLERANCE_DB)
+
+    peak = int(np.argmax(reference))
+    assert abs(main_lobe_index(profile, peak) - peak) <= MAIN_LOBE_SAMPLES
@@ -0,0 +1,73 @@
+import logging
+
+import numpy as np
+
+from bounded_lru import BoundedLRU
+from result_cache import state_key
+
+MIN_TILE_SIZE = 32  # Samples per tile side on small canvases
+TILES_PER_CANVAS = 4  # Tile side is about this fraction of the smaller canvas side, so padding stays below ~1.5×
+DEFAULT_VIEWPORT_CACHE_BYTES = 128 * 1024 * 1024  # Memory cap for cached viewport tiles
+
+
+def tile_spacing(span, pixels):
+    # Sample spacing of at least one canvas pixel, rounded up to a power of two so tiles of one zoom level share
+    # a lattice
+    return float(2.0 ** np.ceil(np.log2(span / max(pixels, 1))))
+
+
+def tile_size(width, height):
+    # Samples per tile side: the power of two nearest below a quarter of the smaller canvas side
+    return int(max(MIN_TILE_SIZE, 2 ** np.floor(np.log2(max(min(width, height), 1) / TILES_PER_CANVAS))))
+
+
+def tile_range(low, high, spacing, size):
+    # Indices of the tiles covering [low, high] along one axis
+    extent = size * spacing
+    return int(np.floor(low / extent)), int(np.floor(high / extent))
+
+
+def tile_axis(index, spacing, size, dtype):
+    return ((index * size + np.arange(size)) * spacing).astype(dtype)
+
+
+class ViewportTiles:
+    # Map tiles at canvas resolution on a fixed power-of-two lattice, cached per state so panning back is free
+    def __init__(self, max_bytes=DEFAULT_VIEWPORT_CACHE_BYTES):
+        self.tiles = BoundedLRU(max_bytes, name="Viewport tiles")
+
+    def window(self, state, x_range, y_range, width, height, field, dtype=np.float64, cancelled=None):
+        # (grid, wave_pattern) covering the visible limits with at most one sample per canvas pixel.
+        # field(state, grid) computes one tile; returns None if cancelled() turns true between tiles.
+        cancelled = cancelled or (lambda: False)
+        dtype = np.dtype(dtype)
+        size = tile_size(width, height)
+        x_spacing = tile_spacing(x_range[1] - x_range[0], width)
+        y_spacing = tile_spacing(y_range[1] - y_range[0], height)
+        i0, i1 = tile_range(*x_range, x_spacing, size)
+        j0, j1 = tile_range(*y_range, y_spacing, size)
+        key = state_key(state)
+
+        wave_pattern = np.empty(((j1 - j0 + 1) * size, (i1 - i0 + 1) * size), dtype=dtype)
+        computed = 0
+        for j in range(j0, j1 + 1):
+            y_axis = tile_axis(j, y_spacing, size, dtype)
+            for i in range(i0, i1 + 1):
+                tile_key = (key, dtype.str, size, x_spacing, y_spacing, i, j)
+                tile = self.tiles.get(tile_key)
+                if tile is None:
+                    if cancelled():
+                        return None
+                    tile = np.asarray(field(state, np.meshgrid(tile_axis(i, x_spacing, size, dtype), y_axis)),
+                                      dtype=dtype)
+                    tile.flags.writeable = False
+                    self.tiles.put(tile_key, tile)
+                    computed += 1
+                rows, cols = (j - j0) * size, (i - i0) * size
+                wave_pattern[rows:rows + size, cols:cols + size] = tile
+
+        tiles = (i1 - i0 + 1) * (j1 - j0 + 1)
+        logging.debug(f"Viewport {wave_pattern.shape}: {computed} of {tiles} tiles computed, {self.tiles.stats()}")
+        x_axis = (np.arange(i0 * size, (i1 + 1) * size) * x_spacing).astype(dtype)
+        y_axis = (np.arange(j0 * size, (j1 + 1) * size) * y_spacing).astype(dtype)
+        return np.meshgrid(x_axis, y_axis), wave_pattern
@@ -0,0 +1,94 @@
+import logging
+
+import numpy as np
+
+from phased_array import compute_emitter_layout, compute_tile_shape, DEFAULT_TILE_BUDGET, DEFAULT_CONTEXT
+from element_array import array_from_layout
+from hybrid_map import compute_hybrid_field
+
+DEFAULT_FRAME_BUDGET = 48  # Frames per animation cycle
+DEFAULT_FRAME_RATE = 24  # Frames per second in the GUI
+
+
+def compute_transmitter_field(cache, N, frequency, steering_angle, distance, grid, geometry="Linear", arc_radius=1.0,
+                              tile_budget=DEFAULT_TILE_BUDGET, context=DEFAULT_CONTEXT):
+    # Complex field F with Re(F·e^{-iωt}) = Σ cos(k·rn + ϕn + ωt), i.e. compute_wave_pattern at time t
+    wavelength = context.wavelength(frequency)
+    positions, phase_shifts = compute_emitter_layout(N, wavelength, steering_angle, distance, geometry, arc_radius)
+
+    if cache is not None and cache.fields.fits(cache.field_bytes(grid, N)):
+        return np.conj(cache.complex_field(grid, positions, phase_shifts, wavelength)), positions
+
+    # No room for cached phasors: accumulate exp(-i(k·rn + ϕn)) tile by tile
+    X_grid, Y_grid = grid
+    real_dtype = X_grid.dtype
+    positions, phase_shifts = positions.astype(real_dtype), phase_shifts.astype(real_dtype)
+    wave_number = real_dtype.type(2 * np.pi / wavelength)
+    field = np.zeros(X_grid.shape, dtype=np.result_type(real_dtype, np.complex64))
+    row_block, col_block, emitter_block = compute_tile_shape(*field.shape, N, tile_budget, field.itemsize)
+    for r0 in range(0, field.shape[0], row_block):
+        for c0 in range(0, field.shape[1], col_block):
+            X_tile = X_grid[r0:r0 + row_block, c0:c0 + col_block, None]
+            Y_tile = Y_grid[r0:r0 + row_block, c0:c0 + col_block, None]
+            for e0 in range(0, N, emitter_block):
+                emitters = positions[e0:e0 + emitter_block]
+                distances = np.hypot(X_tile - emitters[:, 0], Y_tile - emitters[:, 1])
+                field[r0:r0 + row_block, c0:c0 + col_block] += np.exp(
+                    -1j * (wave_number * distances + phase_shifts[e0:e0 + emitter_block])).sum(axis=2)
+    return field, positions
+
+
+def compute_hybrid_transmitter_field(N, frequency, steering_angle, distance, grid, geometry="Linear", arc_radius=1.0,
+                                     far_field_distance=None, tile_budget=DEFAULT_TILE_BUDGET, target_error=None,
+                                     context=DEFAULT_CONTEXT):
+    # compute_transmitter_field for large arrays: the complex map of the hybrid engine that draws them.
+    # compute_hybrid_field returns F with Re(F·e^{iωt}) as the map, so its conjugate follows the e^{-iωt} convention.
+    wavelength = context.wavelength(frequency)
+    array = array_from_layout(N, wavelength, steering_angle, distance, geometry, arc_radius, precision=grid[0].dtype)
+    field, _ = compute_hybrid_field(array, grid, wavelength, far_field_distance, tile_budget=tile_budget,
+                                    target_error=target_error)
+    return np.conj(field), array.positions
+
+
+def compute_receiver_field(grid, frequency, context=DEFAULT_CONTEXT):
+    # Complex field F with Re(F·e^{-iωt}) = cos(k·r - ωt), i.e. compute_receiver_pattern at time t
+    X_grid, Y_grid = grid
+    transmitter_position = np.array([20, 20], dtype=X_grid.dtype)
+    wave_number = X_grid.dtype.type(2 * np.pi / context.wavelength(frequency))
+    return np.exp(1j * wave_number * np.hypot(X_grid - transmitter_position[0], Y_grid - transmitter_position[1]))
+
+
+def animation_frames(field, frequency, n_frames=DEFAULT_FRAME_BUDGET, periods=1.0):
+    # Yields Re(F·e^{-iωt}) for n_frames evenly spaced times over the given number of periods.
+    # The frame is a view into one reused buffer: copy it if it has to outlive the next iteration.
+    omega = 2 * np.pi * frequency
+    rotation_dtype = field.dtype.type
+    times = np.arange(n_frames) * periods / (frequency * n_frames)  # Endpoint excluded so cycles loop seamlessly
+    buffer = np.empty_like(field)
+
+    for t in times:
+        np.multiply(field, rotation_dtype(np.exp(-1j * omega * t)), out=buffer)
+        yield buffer.real
+
+
+def export_frames(frames, path, n_frames, shape, dtype=np.float32):
+    # Streams frames into a .npy file of shape (n_frames, rows, cols) one frame at a time
+    dtype = np.dtype(dtype)
+    header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+              'shape': (n_frames,) + tuple(shape)}
+
+    written = 0
+    with open(path, "wb") as file:
+        np.lib.format.write_array_header_2_0(file, header)
+        for frame in frames:
+            if written == n_frames:
+                break
+            file.write(np.ascontiguousarray(frame, dtype=dtype).tobytes())
+            written += 1
+
+    if written != n_frames:
+        logging.error(f"Animation export to {path} stopped after {written} of {n_frames} frames")
+        raise ValueError("Frame generator ended before the frame budget was written.")
+
+    logging.info(f"Exported {n_frames} animation frames to {path}")
+    return path